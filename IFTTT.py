@@ -1,6 +1,10 @@
+import atexit
 import os
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, Deque
 from dotenv import load_dotenv
 
 
@@ -22,15 +26,53 @@ class IFTTTNotifier:
             url="https://example.com",
             image_url="https://example.com/image.jpg"
         )
+        
+        # Deliver from a background worker instead of blocking the caller. A pending
+        # "Logging..." notification is replaced by a later one with the same key
+        notifier = IFTTTNotifier(async_delivery=True)
+        notifier.send_notification(title="Logging card...", message="", coalesce_key=card_id)
+        notifier.send_notification(title="Card logged!", message="", coalesce_key=card_id)
+        notifier.flush(timeout=10)
+        
+        # Digest bursts: the first 3 cards of a burst notify immediately, any further
+        # ones are summed into a single summary sent once 30s pass without a new card
+        notifier = IFTTTNotifier(digest_window=30, digest_threshold=3, digest_label="Trello cards")
+        notifier.send_notification(title="Card logged!", message="", coalesce_key=card_id,
+                                   digest_info={"title": card_title, "story_points": 3, "exp": 12, "gp": 4.5})
     """
     
-    def __init__(self, webhook_url: Optional[str] = None, load_env: bool = True):
+    # Status codes worth retrying (throttled or server-side errors)
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, webhook_url: Optional[str] = None, load_env: bool = True,
+                 async_delivery: bool = False, max_queue: int = 100, max_retries: int = 3,
+                 retry_delay: float = 1.0, exit_timeout: Optional[float] = 10.0, verbose: bool = True,
+                 digest_window: Optional[float] = None, digest_threshold: int = 3,
+                 digest_label: str = "notifications", digest_max_window: float = 300.0):
         """
         Initialize the IFTTT notifier.
         
         Args:
             webhook_url: IFTTT webhook URL. If None, will try to load from environment.
             load_env: Whether to load environment variables from .env file.
+            async_delivery: Queue notifications for a background worker instead of
+                            sending them before send_notification returns.
+            max_queue: Notifications allowed to wait for delivery (async mode). When
+                       full, the oldest pending notification is dropped.
+            max_retries: Times a failed delivery is retried (async mode).
+            retry_delay: Delay before the first retry, doubled on each further retry.
+            exit_timeout: Seconds to spend delivering pending notifications at exit
+                          (None to wait for all of them).
+            verbose: Whether to print dropped and failed deliveries.
+            digest_window: Seconds of quiet that end a burst window (None disables
+                           digests). Every notification restarts the countdown, so
+                           stragglers (e.g. outbox retries) join the same summary.
+            digest_threshold: Distinct notifications (by coalesce_key) sent immediately
+                              per window; beyond this they are held for one summary
+                              notification sent when the window ends.
+            digest_label: What the summary counts, e.g. "Trello cards".
+            digest_max_window: Seconds a burst window may last at most, however
+                               steady the traffic, before its summary is sent.
         """
         if load_env:
             load_dotenv()
@@ -43,6 +85,33 @@ class IFTTTNotifier:
                 "IFTTT_WEBHOOK_URL must be provided either as parameter or "
                 "environment variable."
             )
+        
+        self.async_delivery = async_delivery
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.exit_timeout = exit_timeout
+        self.verbose = verbose
+        
+        # Pending deliveries, oldest first; each is {"data", "timeout", "coalesce_key"}
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._pending_by_key: Dict[str, Dict[str, Any]] = {}
+        self._in_flight = False
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._exit_flush_registered = False
+        
+        self.digest_window = digest_window
+        self.digest_threshold = digest_threshold
+        self.digest_label = digest_label
+        self.digest_max_window = digest_max_window
+        # Keys sent immediately in the current window, and the held entries by key
+        self._window_start: Optional[float] = None
+        self._window_end: Optional[float] = None
+        self._window_keys: set = set()
+        self._digest: Dict[Any, Dict[str, Any]] = {}
+        self._digest_timer: Optional[threading.Timer] = None
+        self._digest_lock = threading.Lock()
     
     def send_notification(
         self, 
@@ -51,7 +120,9 @@ class IFTTTNotifier:
         url: Optional[str] = None,
         image_url: Optional[str] = None,
         custom_data: Optional[Dict[str, Any]] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        coalesce_key: Optional[str] = None,
+        digest_info: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Send a notification via IFTTT webhook.
@@ -63,9 +134,16 @@ class IFTTTNotifier:
             image_url: Optional image URL
             custom_data: Additional custom data to send
             timeout: Request timeout in seconds
+            coalesce_key: In async mode, a still-pending notification with the same
+                          key (e.g. the card ID) is replaced by this one. Digest
+                          mode counts notifications with the same key once
+            digest_info: What this notification adds to a digest summary: "title",
+                         "story_points", "exp" and "gp" (all optional)
             
         Returns:
-            Dict containing success status and response details
+            Dict containing success status and response details. In async mode
+            "queued" is True and delivery happens later; "digested" is True if it
+            was held for a digest summary.
         """
         # Build the data payload
         data = {
@@ -85,6 +163,19 @@ class IFTTTNotifier:
         if custom_data:
             data.update(custom_data)
         
+        if self.digest_window is not None and self._hold_for_digest(data, coalesce_key, digest_info):
+            return {"success": True, "queued": True, "digested": True, "data_sent": data}
+        
+        return self._deliver(data, timeout, coalesce_key)
+    
+    def _deliver(self, data: Dict[str, Any], timeout: float, coalesce_key: Optional[str] = None) -> Dict[str, Any]:
+        """Send a payload now, or queue it in async mode."""
+        if self.async_delivery:
+            return self._enqueue(data, timeout, coalesce_key)
+        return self._post(data, timeout)
+    
+    def _post(self, data: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """POST a payload to the webhook."""
         try:
             response = requests.post(
                 self.webhook_url, 
@@ -108,6 +199,187 @@ class IFTTTNotifier:
                 "data_sent": data
             }
     
+    def _enqueue(self, data: Dict[str, Any], timeout: float, coalesce_key: Optional[str]) -> Dict[str, Any]:
+        """Queue a payload for the background worker."""
+        with self._condition:
+            pending = self._pending_by_key.get(coalesce_key) if coalesce_key else None
+            if pending is not None:
+                # Superseded before it was sent: deliver only the newer notification
+                pending['data'] = data
+                pending['timeout'] = timeout
+                return {"success": True, "queued": True, "coalesced": True, "data_sent": data}
+            
+            if len(self._queue) >= self.max_queue:
+                dropped = self._queue.popleft()
+                self._forget(dropped)
+                if self.verbose:
+                    print(f"⚠️  Notification queue full, dropping: {dropped['data'].get('title')}")
+            
+            delivery = {"data": data, "timeout": timeout, "coalesce_key": coalesce_key}
+            self._queue.append(delivery)
+            if coalesce_key:
+                self._pending_by_key[coalesce_key] = delivery
+            self._start_worker()
+            self._condition.notify_all()
+        
+        return {"success": True, "queued": True, "coalesced": False, "data_sent": data}
+    
+    def _forget(self, delivery: Dict[str, Any]):
+        """Stop coalescing into a delivery that left the queue (caller holds the lock)."""
+        key = delivery['coalesce_key']
+        if key and self._pending_by_key.get(key) is delivery:
+            del self._pending_by_key[key]
+    
+    def _start_worker(self):
+        """Start the delivery worker on first use (caller holds the lock)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._deliver_forever, daemon=True)
+            self._worker.start()
+            self._register_exit_flush()
+    
+    def _register_exit_flush(self):
+        """Deliver whatever is still pending when the interpreter exits."""
+        if not self._exit_flush_registered:
+            atexit.register(self._flush_at_exit)
+            self._exit_flush_registered = True
+    
+    def _hold_for_digest(self, data: Dict[str, Any], coalesce_key: Optional[str],
+                         digest_info: Optional[Dict[str, Any]]) -> bool:
+        """Hold a notification for the digest if its window has seen a burst."""
+        # Without a key every notification counts on its own
+        key = coalesce_key if coalesce_key else object()
+        
+        with self._digest_lock:
+            now = time.monotonic()
+            if self._window_end is None or now >= self._window_end:
+                self._window_start = now
+                self._window_keys = set()
+            # Every notification keeps the burst open, up to digest_max_window after it began
+            max_window = max(self.digest_window, self.digest_max_window)
+            self._window_end = min(now + self.digest_window, self._window_start + max_window)
+            
+            # Sparse traffic (and later notifications for a key already sent) goes out immediately
+            held = key not in self._window_keys and (
+                key in self._digest or len(self._window_keys) >= self.digest_threshold)
+            if held:
+                entry = self._digest.setdefault(key, {"title": data["title"]})
+                entry.update(digest_info or {})
+            elif key not in self._window_keys:
+                self._window_keys.add(key)
+            
+            if held or self._digest_timer is not None:
+                # (Re)start the countdown to the end of the extended window
+                if self._digest_timer is not None:
+                    self._digest_timer.cancel()
+                self._digest_timer = threading.Timer(self._window_end - now, self.send_digest)
+                self._digest_timer.daemon = True
+                self._digest_timer.start()
+                self._register_exit_flush()
+        return held
+    
+    def send_digest(self) -> Optional[Dict[str, Any]]:
+        """
+        Send the summary of the held notifications now instead of at the end of the window.
+        
+        Returns:
+            The delivery result, or None if nothing was held
+        """
+        with self._digest_lock:
+            entries = list(self._digest.values())
+            self._digest = {}
+            if self._digest_timer is not None:
+                self._digest_timer.cancel()
+                self._digest_timer = None
+        if not entries:
+            return None
+        
+        story_points = sum(entry.get("story_points") or 0 for entry in entries)
+        exp = sum(entry.get("exp") or 0 for entry in entries)
+        gp = sum(entry.get("gp") or 0 for entry in entries)
+        titles = [entry["title"] for entry in entries]
+        
+        title_parts = [f"{len(entries)} {self.digest_label}"]
+        if exp:
+            title_parts.append(f"⭐{round(exp, 2)}")
+        if gp:
+            title_parts.append(f"🪙{round(gp, 2)}")
+        
+        data = {
+            "title": " | ".join(title_parts),
+            "message": f"{round(story_points, 2)} story points: " + ", ".join(f"##{title}##" for title in titles),
+            "digest": {
+                "count": len(entries),
+                "story_points": story_points,
+                "exp": exp,
+                "gp": gp,
+                "titles": titles
+            }
+        }
+        if self.default_image_url:
+            data["image_url"] = self.default_image_url
+        
+        result = self._deliver(data, 30)
+        if not result["success"] and self.verbose:
+            print(f"❌ Failed to send digest of {len(entries)} {self.digest_label}: {result.get('error') or result.get('status_code')}")
+        return result
+    
+    def _deliver_forever(self):
+        """Worker loop: deliver queued notifications in order, retrying failures."""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                delivery = self._queue.popleft()
+                self._forget(delivery)
+                self._in_flight = True
+            
+            try:
+                for attempt in range(self.max_retries + 1):
+                    result = self._post(delivery['data'], delivery['timeout'])
+                    if result['success'] or result.get('status_code') not in self.RETRY_STATUS_CODES | {None}:
+                        break
+                    if attempt < self.max_retries:
+                        time.sleep(self.retry_delay * 2 ** attempt)
+                
+                if not result['success'] and self.verbose:
+                    error = result.get('error') or result.get('status_code')
+                    print(f"❌ Failed to deliver notification '{delivery['data'].get('title')}': {error}")
+            finally:
+                with self._condition:
+                    self._in_flight = False
+                    self._condition.notify_all()
+    
+    def pending_count(self) -> int:
+        """Get the number of notifications queued or being delivered."""
+        with self._condition:
+            return len(self._queue) + (1 if self._in_flight else 0)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send any held digest and wait until every queued notification has been
+        delivered (or given up on).
+        
+        Args:
+            timeout: Seconds to wait at most (None to wait indefinitely)
+            
+        Returns:
+            True if the queue emptied in time
+        """
+        self.send_digest()
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+    
+    def _flush_at_exit(self):
+        if not self.flush(self.exit_timeout) and self.verbose:
+            print(f"⚠️  Exiting with {self.pending_count()} notifications undelivered")
+    
     def send_simple_notification(self, title: str, message: str) -> bool:
         """
         Send a simple notification with just title and message.
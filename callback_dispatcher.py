@@ -0,0 +1,214 @@
+"""
+Callback Dispatcher
+
+Runs notification callbacks on a small worker pool so a slow or dead
+receiver (e.g. the stack server behind desktop_notifier_callback) can't hold
+up Habitica scoring. Callbacks that share a key run one at a time in the
+order they were submitted; callbacks for different keys run in parallel.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+# Tells a worker to stop
+_STOP = object()
+
+
+class CallbackDispatcher:
+    """
+    A bounded worker pool with per-key FIFO ordering.
+
+    Usage:
+        dispatcher = CallbackDispatcher(max_workers=4, timeout=15.0)
+        habitica = HabiticaAPI(callback=desktop_notifier_callback, callback_dispatcher=dispatcher)
+
+        # Or directly
+        dispatcher.submit("hard-doot", notify, result)
+        dispatcher.drain(timeout=5.0)
+
+    Pending callbacks are drained (up to exit_timeout) when the interpreter exits.
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: Optional[float] = 15.0,
+                 max_pending: int = 100, exit_timeout: Optional[float] = 10.0,
+                 verbose: bool = True):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            max_workers: Keys whose callbacks may run at the same time
+            timeout: Seconds a callback may run before it is reported as overrunning
+                     (None to never report). Callbacks always run to completion on
+                     their worker, so a key's callbacks never overlap; a hung
+                     callback holds its worker (and its key) until it returns
+            max_pending: Callbacks allowed to wait; beyond this, new ones are dropped
+            exit_timeout: Seconds to spend draining pending callbacks at exit
+                          (None to wait for all of them)
+            verbose: Whether to print callback errors, timeouts and drops
+        """
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.exit_timeout = exit_timeout
+        self.verbose = verbose
+
+        # Keys with callbacks waiting for a worker
+        self._ready: "queue.Queue[Any]" = queue.Queue()
+        self._lanes: Dict[Hashable, Deque[Tuple[Callable, tuple, dict, Optional[float]]]] = {}
+        self._pending = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Daemon workers, so a stuck callback can't keep the interpreter alive past exit_timeout
+        self._workers = [threading.Thread(target=self._work, name=f'callback-{i}', daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+        atexit.register(self._drain_at_exit)
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        Queue a callback to run after every earlier callback with the same key.
+
+        Args:
+            key: Ordering key (e.g. the task ID)
+            fn: The callback
+            *args, **kwargs: Passed to the callback
+
+        Returns:
+            True if the callback was queued, False if it was dropped (queue full or closed)
+        """
+        return self.submit_with_timeout(key, self.timeout, fn, *args, **kwargs)
+
+    def submit_with_timeout(self, key: Hashable, timeout: Optional[float],
+                            fn: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        Like submit, with a timeout for this callback instead of the dispatcher's.
+
+        Args:
+            key: Ordering key
+            timeout: Seconds the callback may run before it is reported (None to never report)
+            fn: The callback
+            *args, **kwargs: Passed to the callback
+
+        Returns:
+            True if the callback was queued, False if it was dropped
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if self._pending >= self.max_pending:
+                if self.verbose:
+                    print(f"⚠️  Callback queue full ({self.max_pending}), dropping callback for {key}")
+                return False
+
+            self._pending += 1
+            lane = self._lanes.get(key)
+            if lane is not None:
+                # A worker is already running this key's callbacks and will pick it up
+                lane.append((fn, args, kwargs, timeout))
+                return True
+            self._lanes[key] = deque([(fn, args, kwargs, timeout)])
+
+        self._ready.put(key)
+        return True
+
+    def _work(self):
+        """Worker loop: run lanes as they become ready until told to stop."""
+        while True:
+            key = self._ready.get()
+            if key is _STOP:
+                return
+            self._run_lane(key)
+
+    def _run_lane(self, key: Hashable):
+        """Run a key's callbacks in order until its lane is empty."""
+        while True:
+            with self._condition:
+                lane = self._lanes[key]
+                if not lane:
+                    del self._lanes[key]
+                    self._condition.notify_all()
+                    return
+                fn, args, kwargs, timeout = lane.popleft()
+
+            try:
+                self._call(key, fn, args, kwargs, timeout)
+            finally:
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify_all()
+
+    def _call(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict, timeout: Optional[float]):
+        """Run one callback on this worker, reporting it if it overruns timeout."""
+        watchdog = None
+        if timeout is not None and self.verbose:
+            watchdog = threading.Timer(timeout, print, (f"⚠️  Callback for {key} still running after {timeout:g}s",))
+            watchdog.daemon = True
+            watchdog.start()
+
+        started = time.monotonic()
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            if self.verbose:
+                print(f"⚠️  Callback error: {e}")
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+                elapsed = time.monotonic() - started
+                if elapsed > timeout:
+                    print(f"⚠️  Callback for {key} took {elapsed:.1f}s (timeout {timeout:g}s)")
+
+    def pending_count(self) -> int:
+        """Get the number of callbacks queued or running."""
+        with self._condition:
+            return self._pending
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued callback has run.
+
+        Args:
+            timeout: Seconds to wait at most (None to wait indefinitely)
+
+        Returns:
+            True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting callbacks and drain the queue.
+
+        Args:
+            timeout: Seconds to wait for pending callbacks (None to wait indefinitely)
+
+        Returns:
+            True if every pending callback ran
+        """
+        with self._condition:
+            self._closed = True
+        drained = self.drain(timeout)
+        for _ in self._workers:
+            self._ready.put(_STOP)
+        atexit.unregister(self._drain_at_exit)
+        return drained
+
+    def _drain_at_exit(self):
+        pending = self.pending_count()
+        if pending and self.verbose:
+            print(f"⏳ Waiting for {pending} pending callbacks...")
+        if not self.close(self.exit_timeout) and self.verbose:
+            print(f"⚠️  Exiting with {self.pending_count()} callbacks still pending")
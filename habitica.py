@@ -5,39 +5,288 @@ A Python library for interacting with the Habitica API to score habits, manage t
 """
 
 import os
+import queue
 import requests
+import threading
 import time
-from typing import Optional, Dict, Any, List, Callable
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Callable, Iterable, Tuple
 from dotenv import load_dotenv
 
+from callback_dispatcher import CallbackDispatcher
+from habitica_cache import HabiticaTaskIndex
 
-class HabiticaAPI:
+
+class Stats:
     """
-    A library for interacting with the Habitica API.
+    A user's stats, parsed from a userFields projection of /user.
+    
+    Fields that weren't fetched are None.
+    """
+    
+    __slots__ = ('hp', 'mp', 'exp', 'gp', 'lvl', 'max_health', 'max_mp', 'to_next_level')
+    
+    # Habitica's names for the attributes that don't match theirs
+    API_NAMES = {'max_health': 'maxHealth', 'max_mp': 'maxMP', 'to_next_level': 'toNextLevel'}
+    
+    def __init__(self, **stats):
+        for name in self.__slots__:
+            setattr(self, name, stats.get(name))
+    
+    @classmethod
+    def from_dict(cls, stats: Dict[str, Any]) -> 'Stats':
+        """
+        Build Stats from the 'stats' object of a /user response.
+        
+        Args:
+            stats: The user's stats as returned by Habitica
+            
+        Returns:
+            The parsed stats
+        """
+        return cls(**{name: stats.get(cls.API_NAMES.get(name, name)) for name in cls.__slots__})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the fetched stats as a dict keyed by Habitica's field names."""
+        return {self.API_NAMES.get(name, name): getattr(self, name)
+                for name in self.__slots__ if getattr(self, name) is not None}
+    
+    def __repr__(self) -> str:
+        return f"Stats({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+class HabiticaRateLimiter:
+    """
+    Schedules Habitica requests from the X-RateLimit-* response headers.
+    
+    Habitica allows 30 requests per minute per user. While the headers report
+    budget left, requests go out immediately; once it runs low they wait for
+    X-RateLimit-Reset. Until headers have been seen (or when a response comes
+    back without them) requests are spaced by the caller's fallback delay,
+    the fixed spacing HabiticaAPI used to sleep before every request.
     
     Usage:
-        # Using environment variables
-        habitica = HabiticaAPI()
+        limiter = get_shared_rate_limiter()
+        time.sleep(limiter.reserve(fallback=4.0))
+        response = session.post(url, headers=headers)
+        limiter.update_from_headers(response.headers)
+    """
+    
+    def __init__(self, reserve: int = 1):
+        """
+        Initialize the rate limiter.
         
-        # Using explicit credentials
-        habitica = HabiticaAPI(user_id="your_user_id", api_token="your_token")
+        Args:
+            reserve: Requests to leave in the budget before waiting for the reset
+                     (headroom for other clients using the same account)
+        """
+        self.reserve_requests = reserve
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.paused_until = 0.0
+        self._last_request = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self, fallback: float = 0.0) -> float:
+        """
+        Book the next request slot.
         
-        # With callback function for press_plus operations
-        def my_callback(result, task_id, direction):
-            print(f"Callback: {task_id} scored {direction} with result: {result['success']}")
+        Args:
+            fallback: Minimum spacing from the previous request, used while the
+                      budget is unknown
+            
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.time()
+            start = max(now, self.paused_until)
+            
+            if self.reset_at is not None and start >= self.reset_at:
+                # The window has rolled over
+                self.remaining = self.limit
+                self.reset_at = None
+            
+            if self.remaining is None:
+                start = max(start, self._last_request + fallback)
+            elif self.remaining <= self.reserve_requests:
+                if self.reset_at is not None:
+                    # Later requests queue behind this one too
+                    start = self.paused_until = max(start, self.reset_at)
+                    self.remaining = self.limit
+                    self.reset_at = None
+                else:
+                    start = max(start, self._last_request + fallback)
+            
+            if self.remaining is not None:
+                self.remaining -= 1
+            self._last_request = start
+            return start - now
+    
+    def wait(self, fallback: float = 0.0):
+        """
+        Block until the next request may be sent.
         
-        habitica = HabiticaAPI(callback=my_callback)
+        Args:
+            fallback: Minimum spacing from the previous request while the budget is unknown
+        """
+        delay = self.reserve(fallback)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def update_from_headers(self, headers: Dict[str, str]):
+        """
+        Update the budget from a response's X-RateLimit-* headers.
         
-        # Score a doot (callback will be called automatically)
-        habitica.press_plus("hard-doot")
+        Args:
+            headers: Response headers
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        with self._lock:
+            if remaining is None:
+                # No headers: go back to fixed spacing
+                self.remaining = None
+                self.reset_at = None
+                return
+            
+            limit = headers.get('X-RateLimit-Limit')
+            if limit:
+                self.limit = int(limit)
+            self.remaining = int(remaining)
+            self.reset_at = self._parse_reset(headers.get('X-RateLimit-Reset'))
+    
+    def pause(self, seconds: float):
+        """
+        Hold all requests for a while, e.g. after a 429.
         
-        # Log story points
-        habitica.log_story_points(7)
+        Args:
+            seconds: How long to pause
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+            self.remaining = None
+            self.reset_at = None
+    
+    @staticmethod
+    def _parse_reset(value: Optional[str]) -> Optional[float]:
+        """Parse X-RateLimit-Reset (a date string or a number) into a Unix timestamp."""
+        if not value:
+            return None
+        
+        try:
+            number = float(value)
+            if number > 1e12:
+                return number / 1000  # Epoch milliseconds
+            if number > 1e9:
+                return number  # Epoch seconds
+            return time.time() + number  # Seconds from now
+        except ValueError:
+            pass
+        
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            pass
+        
+        try:
+            # JavaScript Date.toString(), e.g. "Thu Apr 18 2024 10:38:15 GMT+0000 (Coordinated Universal Time)"
+            return datetime.strptime(value.split(' (')[0], '%a %b %d %Y %H:%M:%S GMT%z').timestamp()
+        except ValueError:
+            return None
+
+
+# Process-wide limiter shared by every HabiticaAPI that isn't given its own
+_shared_rate_limiter: Optional[HabiticaRateLimiter] = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> HabiticaRateLimiter:
+    """
+    Get the process-wide Habitica rate limiter, creating it on first use.
+    
+    Returns:
+        The shared rate limiter
+    """
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = HabiticaRateLimiter()
+        return _shared_rate_limiter
+
+
+# Story points each doot difficulty is worth, in tenths of a point
+DOOT_TENTHS = {'hard': 20, 'medium': 15, 'easy': 10, 'trivial': 1}
+
+
+@lru_cache(maxsize=256)
+def _plan_presses(tenths: int, costs: Tuple[Tuple[str, float], ...]) -> Tuple[Tuple[str, int], ...]:
+    """
+    Find the cheapest combination of doots adding up to exactly `tenths`.
+    
+    Args:
+        tenths: Story points in tenths of a point
+        costs: (difficulty, cost per press) pairs; an infinite cost disables a difficulty
+        
+    Returns:
+        (difficulty, count) pairs in DOOT_TENTHS order
+    """
+    cost_of = dict(costs)
+    options = [(difficulty, points, cost_of.get(difficulty, 1.0))
+               for difficulty, points in DOOT_TENTHS.items()]
+    
+    # best[v]: cheapest cost for exactly v tenths, choice[v]: the last doot of that plan
+    best = [0.0] + [float('inf')] * tenths
+    choice: List[Optional[str]] = [None] * (tenths + 1)
+    for value in range(1, tenths + 1):
+        for difficulty, points, cost in options:
+            if points <= value and best[value - points] + cost < best[value]:
+                best[value] = best[value - points] + cost
+                choice[value] = difficulty
+    
+    if best[tenths] == float('inf'):
+        raise ValueError(f"No combination of enabled difficulties adds up to {tenths / 10} story points")
+    
+    counts = dict.fromkeys(DOOT_TENTHS, 0)
+    value = tenths
+    while value > 0:
+        counts[choice[value]] += 1
+        value -= DOOT_TENTHS[choice[value]]
+    return tuple(counts.items())
+
+
+class HabiticaClientBase:
+    """
+    Configuration and transport-independent logic shared by HabiticaAPI and
+    AsyncHabiticaAPI (habitica_async.py): credentials, stat deltas, press
+    planning, and resolving/validating doots through the task index.
+    
+    Subclasses send the requests and set TRANSPORT_ERRORS to the exceptions
+    their transport raises.
     """
     
-    def __init__(self, user_id: Optional[str] = None, api_token: Optional[str] = None, load_env: bool = True, callback: Optional[Callable[[Dict[str, Any], str, str], None]] = None):
+    # Default API root (override with base_url or HABITICA_BASE_URL, e.g. for habitica_fake_server.py)
+    BASE_URL = "https://habitica.com/api/v3"
+    
+    # Spacing between requests when Habitica sends no rate-limit headers
+    PROFILE_SPACING = 3.0
+    SCORE_SPACING = 4.0
+    
+    # Stats fetched by get_stats() unless told otherwise
+    STATS_FIELDS = ('exp', 'gp', 'lvl', 'hp', 'mp')
+    
+    # Exceptions a failed request raises (a task index lookup falls back on them)
+    TRANSPORT_ERRORS: Tuple[type, ...] = (requests.exceptions.RequestException,)
+    
+    def __init__(self, user_id: Optional[str] = None, api_token: Optional[str] = None, load_env: bool = True, callback: Optional[Callable[[Dict[str, Any], str, str], None]] = None,
+                 rate_limiter: Optional[HabiticaRateLimiter] = None, max_rate_limit_retries: int = 3,
+                 stats_max_age: float = 5.0, press_costs: Optional[Dict[str, float]] = None,
+                 task_index: Optional[HabiticaTaskIndex] = None, base_url: Optional[str] = None,
+                 callback_dispatcher: Optional[CallbackDispatcher] = None):
         """
-        Initialize the Habitica API client.
+        Initialize the client configuration shared by the sync and async clients.
         
         Args:
             user_id: Habitica User ID. If None, will try to load from environment.
@@ -45,6 +294,22 @@ class HabiticaAPI:
             load_env: Whether to load environment variables from .env file.
             callback: Optional callback function for press_plus operations. 
                      Called with (result, task_id, direction) after each press_plus.
+            rate_limiter: Scheduler pacing requests by Habitica's rate-limit headers.
+                     If None, the process-wide shared limiter is used.
+            max_rate_limit_retries: Times a request is retried after a 429.
+            stats_max_age: Seconds the stats from this client's last score response
+                     may be reused as the starting point for stat deltas. Keep it
+                     short: other kernels (and gold spent by hand) change exp/gp too,
+                     and anything they change in that window counts as our delta.
+            press_costs: Cost of one press per difficulty for break_down_difficulty
+                     (default 1.0 each, i.e. minimize the number of presses).
+            task_index: Cached task list used to resolve aliases to task IDs and to
+                     reject unknown doots before spending a request on them.
+            base_url: API root to send requests to. If None, HABITICA_BASE_URL from the
+                     environment, or Habitica itself.
+            callback_dispatcher: Runs the callback on a worker pool (in order per task)
+                     instead of on the scoring thread, so a slow callback doesn't
+                     delay the next press.
         """
         if load_env:
             load_dotenv()
@@ -52,6 +317,9 @@ class HabiticaAPI:
         self.user_id = user_id or os.getenv('HABITICA_USER_ID')
         self.api_token = api_token or os.getenv('HABITICA_API_TOKEN')
         self.callback = callback  # Store the callback for press_plus operations
+        self.callback_dispatcher = callback_dispatcher
+        self.press_costs = press_costs
+        self.task_index = task_index
         
         if not self.user_id:
             raise ValueError(
@@ -64,39 +332,375 @@ class HabiticaAPI:
                 "environment variable."
             )
             
-        self.base_url = "https://habitica.com/api/v3"
+        self.base_url = (base_url or os.getenv('HABITICA_BASE_URL') or self.BASE_URL).rstrip('/')
         self.headers = {
             "x-api-user": self.user_id,
             "x-api-key": self.api_token,
             "x-client": f"{self.user_id}-PythonLibrary",
             "Content-Type": "application/json"
         }
+        
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+        
+        # Last exp/gp/level seen in a score response (see log_story_points track_deltas)
+        self.stats_max_age = stats_max_age
+        self._last_stats: Optional[Dict[str, Any]] = None
+        self._last_stats_at = 0.0
+    
+    def _remember_stats(self, stats: Dict[str, Any]):
+        """Cache exp/gp/level from a score response sent by this client."""
+        if all(key in stats for key in ('exp', 'gp', 'lvl')):
+            self._last_stats = {'exp': stats['exp'], 'gp': stats['gp'], 'level': stats['lvl']}
+            self._last_stats_at = time.time()
+    
+    def _recent_stats(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get the cached exp/gp/level if they are younger than max_age (default stats_max_age)."""
+        max_age = self.stats_max_age if max_age is None else max_age
+        if self._last_stats is None or time.time() - self._last_stats_at > max_age:
+            return None
+        return dict(self._last_stats)
+    
+    @staticmethod
+    def exp_to_next_level(level: int) -> int:
+        """
+        Experience needed to go from a level to the next (Habitica's toNextLevel formula).
+        
+        Args:
+            level: The current level
+            
+        Returns:
+            Experience points needed to level up
+        """
+        return round((level ** 2 * 0.25 + 10 * level + 139.75) / 10) * 10
+    
+    @classmethod
+    def compute_stat_deltas(cls, starting_stats: Dict[str, Any], ending_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compute exp/gp/level gained between two stat snapshots.
+        
+        Experience resets on level-up, so the experience needed for every level
+        passed is added back.
+        
+        Args:
+            starting_stats: Dict with 'exp', 'gp' and 'level' before scoring
+            ending_stats: Dict with 'exp', 'gp' and 'level' after scoring
+            
+        Returns:
+            Dict with 'exp', 'gp' and 'level' deltas
+        """
+        exp_delta = ending_stats['exp'] - starting_stats['exp']
+        for level in range(starting_stats['level'], ending_stats['level']):
+            exp_delta += cls.exp_to_next_level(level)
+        
+        return {
+            'exp': exp_delta,
+            'gp': ending_stats['gp'] - starting_stats['gp'],
+            'level': ending_stats['level'] - starting_stats['level']
+        }
+    
+    def _print_score_result(self, result: Dict, direction: str, task_id: str):
+        """Print the results of scoring a doot."""
+        symbol = "+" if direction == "up" else "-"
+        data = result.get('data', {})
+        
+        # Show basic scoring result
+        delta = data.get('delta', 0)
+        print(f"✅ {symbol} {task_id} (Δ: {delta:+.3f})")
+        
+        # Show current stats
+        stats = {
+            'HP': data.get('hp', 0),
+            'MP': data.get('mp', 0), 
+            'XP': data.get('exp', 0),
+            'Gold': data.get('gp', 0),
+            'Level': data.get('lvl', 0)
+        }
+        
+        stats_str = " | ".join([f"{k}: {v:.1f}" if isinstance(v, float) else f"{k}: {v}" 
+                               for k, v in stats.items()])
+        print(f"   📊 {stats_str}")
+        
+        # Handle temporary/special effects
+        tmp_data = data.get('_tmp', {})
+        
+        # Quest progress
+        if 'quest' in tmp_data:
+            quest_info = tmp_data['quest']
+            if 'progressDelta' in quest_info:
+                progress = quest_info['progressDelta']
+                print(f"   🗡️  Quest progress: +{progress:.2f}")
+            if 'collection' in quest_info:
+                collection = quest_info['collection']
+                print(f"   📦 Quest collection: +{collection}")
+        
+        # Item drops
+        if 'drop' in tmp_data:
+            drop_info = tmp_data['drop']
+            item_name = drop_info.get('key', 'Unknown')
+            item_type = drop_info.get('type', 'Item')
+            print(f"   🎁 Item dropped: {item_name} ({item_type})")
+            if 'dialog' in drop_info:
+                print(f"      💬 {drop_info['dialog']}")
+        
+        # Show notifications if any
+        notifications = result.get('notifications', [])
+        if notifications:
+            print(f"   🔔 {len(notifications)} notification(s)")
+    
+    @staticmethod
+    def break_down_difficulty(value: float, costs: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+        """
+        Break down a number into the cheapest combination of difficulty parts.
+        
+        Works in exact tenths of a point (anything finer is dropped) and minimizes
+        the total cost of the presses, which with the default cost of 1.0 per press
+        means the fewest Habitica requests. Plans are memoized per value.
+        
+        Args:
+            value: The number to break down (story points)
+            costs: Optional cost of one press per difficulty ('hard', 'medium',
+                   'easy', 'trivial'). Missing difficulties cost 1.0; use
+                   float('inf') to disable one
+            
+        Returns:
+            Dict with counts for each difficulty level
+        """
+        if value < 0:
+            raise ValueError("Value must be non-negative")
+        
+        tenths = int(round(value * 10, 6))
+        return dict(_plan_presses(tenths, tuple(sorted((costs or {}).items()))))
+    
+    @staticmethod
+    def _plan(difficulties: Dict[str, int]) -> List[str]:
+        """Expand a breakdown into the doots to press, in order."""
+        return [f"{difficulty}-doot"
+                for difficulty, count in difficulties.items()
+                for _ in range(count)]
+    
+    def _lookup_task(self, task_id: str, fetch: Callable[[], List[Dict[str, Any]]]) -> Optional[str]:
+        """Resolve an alias to a task ID through the task index (None if the task doesn't exist)."""
+        if self.task_index is None:
+            return task_id
+        try:
+            return self.task_index.resolve(task_id, fetch)
+        except self.TRANSPORT_ERRORS:
+            # Index unavailable, let Habitica resolve the alias
+            return task_id
+    
+    def _missing_doots(self, difficulties: Dict[str, int], fetch: Callable[[], List[Dict[str, Any]]]) -> List[str]:
+        """Find the doots of a breakdown that the task index doesn't know (see validate_breakdown)."""
+        if self.task_index is None:
+            return []
+        aliases = [f"{difficulty}-doot" for difficulty, count in difficulties.items() if count]
+        try:
+            return self.task_index.missing(aliases, fetch)
+        except self.TRANSPORT_ERRORS:
+            return []
+    
+    @staticmethod
+    def _ending_stats(results: List[Dict[str, Any]], plan: List[str], starting_stats: Dict[str, Any],
+                      track_deltas: bool) -> Optional[Dict[str, Any]]:
+        """Get log_story_points' ending stats from its score responses (None if they must be fetched)."""
+        if not track_deltas:
+            return None
+        if not plan:
+            return starting_stats
+        # The last score response has them if every press succeeded
+        if results and all(r.get('success') for r in results):
+            last_data = results[-1].get('data', {})
+            if all(key in last_data for key in ('exp', 'gp', 'lvl')):
+                return {'exp': last_data['exp'], 'gp': last_data['gp'], 'level': last_data['lvl']}
+        return None
+    
+    def _story_points_info(self, story_points: float, difficulties: Dict[str, int], plan: List[str],
+                           results: List[Dict[str, Any]], successful_scores: int,
+                           starting_stats: Dict[str, Any], ending_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the result of log_story_points."""
+        info = {
+            "success": successful_scores == len(plan),
+            "story_points": story_points,
+            "difficulty_breakdown": difficulties,
+            "results": results,
+            "successful_scores": successful_scores,
+            "stat_deltas": self.compute_stat_deltas(starting_stats, ending_stats)
+        }
+        failures = [r for r in results if not r.get('success')]
+        if failures:
+            info["error"] = f"Failed to score {failures[0]['task_id']}: {failures[0].get('error', 'Unknown error')}"
+        return info
+
+
+class HabiticaAPI(HabiticaClientBase):
+    """
+    A library for interacting with the Habitica API.
+    
+    Usage:
+        # Using environment variables
+        habitica = HabiticaAPI()
+        
+        # Using explicit credentials
+        habitica = HabiticaAPI(user_id="your_user_id", api_token="your_token")
+        
+        # With callback function for press_plus operations
+        def my_callback(result, task_id, direction):
+            print(f"Callback: {task_id} scored {direction} with result: {result['success']}")
+        
+        habitica = HabiticaAPI(callback=my_callback)
+        
+        # Score a doot (callback will be called automatically)
+        habitica.press_plus("hard-doot")
+        
+        # Log story points
+        habitica.log_story_points(7)
+    """
+    
+    def __init__(self, user_id: Optional[str] = None, api_token: Optional[str] = None, load_env: bool = True, callback: Optional[Callable[[Dict[str, Any], str, str], None]] = None,
+                 rate_limiter: Optional[HabiticaRateLimiter] = None, max_rate_limit_retries: int = 3,
+                 stats_max_age: float = 5.0, press_costs: Optional[Dict[str, float]] = None,
+                 task_index: Optional[HabiticaTaskIndex] = None, base_url: Optional[str] = None,
+                 callback_dispatcher: Optional[CallbackDispatcher] = None):
+        """
+        Initialize the Habitica API client.
+        
+        Args:
+            As for HabiticaClientBase.
+        """
+        super().__init__(user_id=user_id, api_token=api_token, load_env=load_env, callback=callback,
+                         rate_limiter=rate_limiter, max_rate_limit_retries=max_rate_limit_retries,
+                         stats_max_age=stats_max_age, press_costs=press_costs, task_index=task_index,
+                         base_url=base_url, callback_dispatcher=callback_dispatcher)
+        
+        # Keep-alive connection reused across requests
+        self.session = requests.Session()
+    
+    def _request(self, method: str, url: str, spacing: float = 0.0,
+                 delay: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Send a request paced by the rate limiter, retrying after a 429.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            spacing: Fallback spacing from the previous request while no
+                     rate-limit headers are available
+            delay: Fixed delay to sleep instead of asking the rate limiter
+            **kwargs: Passed through to requests.Session.request
+            
+        Returns:
+            The response (possibly still a 429 if retries ran out)
+        """
+        if delay is not None:
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            self.rate_limiter.wait(spacing)
+        
+        for attempt in range(self.max_rate_limit_retries + 1):
+            response = self.session.request(method, url, headers=self.headers, **kwargs)
+            self.rate_limiter.update_from_headers(response.headers)
+            
+            if response.status_code != 429:
+                return response
+            
+            try:
+                wait = float(response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                reset_at = self.rate_limiter.reset_at
+                wait = reset_at - time.time() if reset_at else max(spacing, 1.0) * 2.0 ** attempt
+            self.rate_limiter.pause(wait)
+            self.rate_limiter.wait()
+        
+        return response
 
-    def get_profile(self, delay: float = 3.0) -> Dict[str, Any]:
+    def get_profile(self, delay: Optional[float] = None) -> Dict[str, Any]:
         """
         Get user's profile information.
         
+        Args:
+            delay: Fixed delay in seconds before the request. If None, the rate
+                   limiter decides (PROFILE_SPACING when Habitica sends no headers)
+        
         Returns:
             Dict containing user profile data
         """
         url = f"{self.base_url}/user"
 
-        if delay > 0:
-            time.sleep(delay)
-
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', url, spacing=self.PROFILE_SPACING, delay=delay)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"success": False, "error": str(e)}
     
+    def get_stats(self, fields: Iterable[str] = HabiticaClientBase.STATS_FIELDS, delay: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the user's stats without downloading the whole user document.
+        
+        Only the requested stats are fetched, using the userFields projection of /user.
+        
+        Args:
+            fields: Habitica stat names to fetch ('exp', 'gp', 'lvl', 'hp', 'mp',
+                    'maxHealth', 'maxMP', 'toNextLevel')
+            delay: Fixed delay in seconds before the request. If None, the rate
+                   limiter decides (PROFILE_SPACING when Habitica sends no headers)
+            
+        Returns:
+            Dict with "success" and "stats" (a Stats object), or "error"
+        """
+        url = f"{self.base_url}/user"
+        params = {'userFields': ','.join(f"stats.{field}" for field in fields)}
+        
+        try:
+            response = self._request('GET', url, spacing=self.PROFILE_SPACING, delay=delay, params=params)
+            response.raise_for_status()
+            result = response.json()
+            
+            if result.get('success'):
+                stats = result.get('data', {}).get('stats', {})
+                return {
+                    "success": True,
+                    "stats": Stats.from_dict(stats)
+                }
+            else:
+                return {"success": False, "error": "API returned success=False"}
+                
+        except requests.exceptions.RequestException as e:
+            return {"success": False, "error": str(e)}
+    
+    def get_stat_snapshot(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the exp/gp/level to compute stat deltas from (see compute_stat_deltas).
+        
+        The stats of this client's last score response are reused if they are
+        younger than max_age seconds; otherwise they are fetched from /user.
+        
+        Args:
+            max_age: Oldest score response to reuse, in seconds (default
+                     stats_max_age, 0 to always fetch)
+            
+        Returns:
+            Dict with "success" and "stats" ({'exp', 'gp', 'level'}), or "error"
+        """
+        stats = self._recent_stats(max_age)
+        if stats is not None:
+            return {"success": True, "stats": stats}
+        
+        response = self.get_stats(fields=('exp', 'gp', 'lvl'))
+        if not response.get('success'):
+            return {"success": False, "error": response.get('error', 'Unknown error')}
+        
+        stats = response['stats']
+        return {"success": True, "stats": {'exp': stats.exp, 'gp': stats.gp, 'level': stats.lvl}}
+    
     def score_habit(
         self, 
         task_id: str, 
         direction: str = "up", 
         verbose: bool = True,
-        delay: float = 4.0
+        delay: Optional[float] = None,
+        run_callback: bool = True
     ) -> Dict[str, Any]:
         """
         Score a doot (task component) using its task ID.
@@ -105,26 +709,47 @@ class HabiticaAPI:
             task_id: The task ID/alias of your doot
             direction: "up" for + button, "down" for - button
             verbose: Whether to print scoring results
-            delay: Delay in seconds before making the request (for rate limiting)
+            delay: Fixed delay in seconds before the request. If None, the rate
+                   limiter decides (SCORE_SPACING when Habitica sends no headers)
+            run_callback: Whether to call the callback here (score_many calls it itself)
             
         Returns:
             Dict containing success status and response details
         """
         if direction not in ["up", "down"]:
             raise ValueError("Direction must be 'up' or 'down'")
-            
-        url = f"{self.base_url}/tasks/{task_id}/score/{direction}"
         
-        if delay > 0:
-            time.sleep(delay)
+        score_id = self._resolve_task(task_id)
+        if score_id is None:
+            if verbose:
+                print(f"❌ Unknown doot {task_id}")
+            final_result = {
+                "success": False,
+                "task_id": task_id,
+                "direction": direction,
+                "error": f"No task with alias or ID {task_id}"
+            }
+            if run_callback:
+                self._run_callback(final_result, task_id, direction, verbose)
+            return final_result
+            
+        url = f"{self.base_url}/tasks/{score_id}/score/{direction}"
             
         try:
-            response = requests.post(url, headers=self.headers)
+            response = self._request('POST', url, spacing=self.SCORE_SPACING, delay=delay)
+            if response.status_code == 404 and self.task_index is not None:
+                # The task was deleted or recreated since the index was built
+                self.task_index.invalidate()
+                retry_id = self._resolve_task(task_id)
+                if retry_id is not None and retry_id != score_id:
+                    url = f"{self.base_url}/tasks/{retry_id}/score/{direction}"
+                    response = self._request('POST', url, spacing=self.SCORE_SPACING)
             response.raise_for_status()
             
             result = response.json()
             
             if result.get('success'):
+                self._remember_stats(result.get('data', {}))
                 if verbose:
                     self._print_score_result(result, direction, task_id)
                 
@@ -155,64 +780,77 @@ class HabiticaAPI:
                 "error": str(e)
             }
         
-        # Call the callback function if provided and this is a press_plus operation
+        if run_callback:
+            self._run_callback(final_result, task_id, direction, verbose)
+        
+        return final_result
+    
+    def _run_callback(self, result: Dict[str, Any], task_id: str, direction: str, verbose: bool = True):
+        """Call the callback function if provided and this is a press_plus operation."""
         if self.callback and direction == "up":
+            if self.callback_dispatcher is not None:
+                self.callback_dispatcher.submit(task_id, self.callback, result, task_id, direction)
+                return
             try:
-                self.callback(final_result, task_id, direction)
+                self.callback(result, task_id, direction)
             except Exception as e:
                 if verbose:
                     print(f"⚠️  Callback error: {e}")
-        
-        return final_result
     
-    def _print_score_result(self, result: Dict, direction: str, task_id: str):
-        """Print the results of scoring a doot."""
-        symbol = "+" if direction == "up" else "-"
-        data = result.get('data', {})
+    def score_many(
+        self, 
+        task_ids: List[str], 
+        direction: str = "up", 
+        verbose: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Score a planned sequence of doots back to back.
         
-        # Show basic scoring result
-        delta = data.get('delta', 0)
-        print(f"✅ {symbol} {task_id} (Δ: {delta:+.3f})")
+        The POSTs are sent one after another from a background thread, paced only
+        by the rate limiter, while results are printed and callbacks run in order
+        on the calling thread (or are handed to the callback_dispatcher). A slow
+        callback (e.g. a desktop notification) therefore doesn't hold up the next press. Presses are not sent
+        concurrently, since Habitica updates the same user document on each one.
         
-        # Show current stats
-        stats = {
-            'HP': data.get('hp', 0),
-            'MP': data.get('mp', 0), 
-            'XP': data.get('exp', 0),
-            'Gold': data.get('gp', 0),
-            'Level': data.get('lvl', 0)
-        }
+        Args:
+            task_ids: Task IDs/aliases to score, in order
+            direction: "up" for + button, "down" for - button
+            verbose: Whether to print scoring results
+            
+        Returns:
+            List of score_habit results, in the order of task_ids
+        """
+        if direction not in ["up", "down"]:
+            raise ValueError("Direction must be 'up' or 'down'")
         
-        stats_str = " | ".join([f"{k}: {v:.1f}" if isinstance(v, float) else f"{k}: {v}" 
-                               for k, v in stats.items()])
-        print(f"   📊 {stats_str}")
+        pending: "queue.Queue" = queue.Queue()
         
-        # Handle temporary/special effects
-        tmp_data = data.get('_tmp', {})
+        def send():
+            try:
+                for task_id in task_ids:
+                    pending.put(self.score_habit(task_id, direction, verbose=False, run_callback=False))
+            except Exception as e:
+                pending.put(e)
         
-        # Quest progress
-        if 'quest' in tmp_data:
-            quest_info = tmp_data['quest']
-            if 'progressDelta' in quest_info:
-                progress = quest_info['progressDelta']
-                print(f"   🗡️  Quest progress: +{progress:.2f}")
-            if 'collection' in quest_info:
-                collection = quest_info['collection']
-                print(f"   📦 Quest collection: +{collection}")
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
         
-        # Item drops
-        if 'drop' in tmp_data:
-            drop_info = tmp_data['drop']
-            item_name = drop_info.get('key', 'Unknown')
-            item_type = drop_info.get('type', 'Item')
-            print(f"   🎁 Item dropped: {item_name} ({item_type})")
-            if 'dialog' in drop_info:
-                print(f"      💬 {drop_info['dialog']}")
+        results = []
+        for task_id in task_ids:
+            result = pending.get()
+            if isinstance(result, Exception):
+                raise result
+            
+            if verbose:
+                if result['success']:
+                    self._print_score_result(result, direction, task_id)
+                else:
+                    print(f"❌ Failed to score doot {task_id}: {result.get('error')}")
+            self._run_callback(result, task_id, direction, verbose)
+            results.append(result)
         
-        # Show notifications if any
-        notifications = result.get('notifications', [])
-        if notifications:
-            print(f"   🔔 {len(notifications)} notification(s)")
+        sender.join()
+        return results
     
     def press_plus(
         self, 
@@ -249,39 +887,74 @@ class HabiticaAPI:
         """
         return self.score_habit(task_id, "down", verbose=verbose)
     
-    def get_tasks(self, task_type: Optional[str] = None) -> Dict[str, Any]:
+    def get_tasks(self, task_type: Optional[str] = None, cached: bool = False) -> Dict[str, Any]:
         """
         Get user's tasks.
         
         Args:
             task_type: Type of tasks to retrieve ('habits', 'dailys', 'todos', 'rewards')
+            cached: Serve the tasks from the task index (if configured) instead of
+                    refetching them
             
         Returns:
             Dict containing tasks data
         """
+        if cached and self.task_index is not None:
+            try:
+                return {"success": True, "data": self.task_index.tasks(self._fetch_tasks, task_type)}
+            except requests.exceptions.RequestException as e:
+                return {"success": False, "error": str(e)}
+        
         url = f"{self.base_url}/tasks/user"
         params = {}
         if task_type:
             params['type'] = task_type
             
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self._request('GET', url, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"success": False, "error": str(e)}
     
+    def _fetch_tasks(self) -> List[Dict[str, Any]]:
+        """Fetch every task for the task index, raising on failure."""
+        result = self.get_tasks()
+        if not result.get('success'):
+            raise requests.exceptions.RequestException(result.get('error', 'API returned success=False'))
+        return result.get('data', [])
+    
+    def _resolve_task(self, task_id: str) -> Optional[str]:
+        """Resolve an alias to a task ID through the task index (None if the task doesn't exist)."""
+        return self._lookup_task(task_id, self._fetch_tasks)
+    
+    def validate_breakdown(self, difficulties: Dict[str, int]) -> List[str]:
+        """
+        Check that the doots a breakdown would press exist, without scoring anything.
+        
+        Args:
+            difficulties: Counts per difficulty, as returned by break_down_difficulty
+            
+        Returns:
+            List of unknown doot aliases (always empty without a task index)
+        """
+        return self._missing_doots(difficulties, self._fetch_tasks)
+    
     def get_user_stats(self) -> Dict[str, Any]:
         """
         Get user's current stats (HP, XP, Gold, etc.).
         
+        Only the stats part of the user document is fetched. Use get_stats()
+        for a parsed Stats object with just the fields you need.
+        
         Returns:
             Dict containing user stats
         """
         url = f"{self.base_url}/user"
+        params = {'userFields': 'stats'}
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', url, params=params)
             response.raise_for_status()
             result = response.json()
             
@@ -297,43 +970,16 @@ class HabiticaAPI:
         except requests.exceptions.RequestException as e:
             return {"success": False, "error": str(e)}
     
-    @staticmethod
-    def break_down_difficulty(value: float) -> Dict[str, int]:
-        """
-        Break down a number into difficulty parts using a greedy algorithm.
-        
-        Args:
-            value: The number to break down (story points)
-            
-        Returns:
-            Dict with counts for each difficulty level
-        """
-        if value < 0:
-            raise ValueError("Value must be non-negative")
-        
-        # Define difficulty values in descending order for greedy approach
-        difficulties = {
-            'hard': 2.0,
-            'medium': 1.5,
-            'easy': 1.0,
-            'trivial': 0.1
-        }
-        
-        result = {'hard': 0, 'medium': 0, 'easy': 0, 'trivial': 0}
-        remaining = float(value)
-        
-        # Use greedy algorithm to break down the value
-        for difficulty, points in difficulties.items():
-            count = int(remaining / points)
-            result[difficulty] = count
-            remaining = round(remaining - (count * points), 1)
-        
-        return result
-    
     def log_story_points(
         self, 
         story_points: float, 
-        verbose: bool = True
+        verbose: bool = True,
+        aggregate: bool = False,
+        track_deltas: bool = False,
+        difficulties: Optional[Dict[str, int]] = None,
+        presses_done: int = 0,
+        starting_stats: Optional[Dict[str, Any]] = None,
+        on_press: Optional[Callable[[int], None]] = None
     ) -> Dict[str, Any]:
         """
         Log story points to Habitica by breaking them down into difficulty levels.
@@ -341,78 +987,87 @@ class HabiticaAPI:
         Args:
             story_points: Number of story points to log
             verbose: Whether to print progress
+            aggregate: Plan every press up front and send them back to back with
+                       score_many(), printing one summary instead of per-press progress
+            track_deltas: Derive the ending stats from the last score response instead
+                       of fetching /user after scoring. The starting stats are still
+                       fetched, unless this client scored within stats_max_age
+                       seconds (a chain of back-to-back cards)
+            difficulties: Counts per difficulty to press, instead of planning them
+                       from story_points (e.g. a plan saved by an earlier attempt)
+            presses_done: Presses at the start of the plan that an earlier attempt
+                       already scored; they are skipped
+            starting_stats: exp/gp/level from before the first press (see
+                       get_stat_snapshot). Required to resume with presses_done,
+                       so the deltas cover the earlier presses too
+            on_press: Called with the number of presses done after each successful
+                       press, e.g. to checkpoint them. Presses are then sent one at a
+                       time and scoring stops at the first failure, so the presses
+                       done are always the start of the plan
             
         Returns:
             Dict containing results of all doot scoring
         """
-        response = self.get_profile()
-        data = response['data']
-
-        if not response.get('success'):
-            if verbose:
-                print(f"❌ Failed to get user profile: {response.get('error', 'Unknown error')}")
-            return {"success": False, "error": response.get('error', 'Unknown error')}
-
-        starting_stats = {}
-        starting_stats['exp'] = data['stats']['exp']
-        starting_stats['gp'] = data['stats']['gp']
-        starting_stats['level'] = data['stats']['lvl']
+        if presses_done and starting_stats is None:
+            raise ValueError("starting_stats is required to resume with presses_done")
+        
+        if starting_stats is None:
+            response = self.get_stat_snapshot(max_age=None if track_deltas else 0)
+            if not response.get('success'):
+                if verbose:
+                    print(f"❌ Failed to get user stats: {response['error']}")
+                return {"success": False, "error": response['error']}
+            starting_stats = response['stats']
 
         if verbose:
             print(f"📊 Logging {story_points} story points...")
         
-        difficulties = self.break_down_difficulty(story_points)
-        results = []
+        if difficulties is None:
+            difficulties = self.break_down_difficulty(story_points, self.press_costs)
+        plan = self._plan(difficulties)
         
         if verbose:
             print(f"   Breakdown: {difficulties}")
         
-        for difficulty, count in difficulties.items():
-            if count == 0:
-                continue
-                
-            task_id = f"{difficulty}-doot"
-            
-            for i in range(count):
+        unknown = self.validate_breakdown(difficulties)
+        if unknown:
+            if verbose:
+                print(f"❌ Unknown doots: {', '.join(unknown)}")
+            return {"success": False, "error": f"Unknown doots: {', '.join(unknown)}"}
+        
+        if aggregate and on_press is None:
+            results = self.score_many(plan[presses_done:], verbose=False)
+        else:
+            results = []
+            for index in range(presses_done, len(plan)):
+                task_id = plan[index]
                 if verbose:
-                    print(f"   Scoring {difficulty} doot ({i+1}/{count})")
+                    print(f"   Scoring {task_id} ({index + 1}/{len(plan)})")
                 
                 result = self.press_plus(task_id, verbose=verbose)
                 results.append(result)
+                if on_press is not None:
+                    if not result.get('success'):
+                        break
+                    on_press(index + 1)
         
-        successful_scores = sum(1 for r in results if r.get('success'))
+        successful_scores = presses_done + sum(1 for r in results if r.get('success'))
         
         if verbose:
-            print(f"✅ Logged {successful_scores}/{len(results)} doots successfully")
+            print(f"✅ Logged {successful_scores}/{len(plan)} doots successfully")
         
         # Get final stats after scoring
-        response = self.get_profile()
-        data = response['data']
-
-        if not response.get('success'):
-            if verbose:
-                print(f"❌ Failed to get user profile: {response.get('error', 'Unknown error')}")
-            return {"success": False, "error": response.get('error', 'Unknown error')}
-
-        ending_stats = {}
-        ending_stats['exp'] = data['stats']['exp']
-        ending_stats['gp'] = data['stats']['gp']
-        ending_stats['level'] = data['stats']['lvl']
-
-        stat_deltas = {
-            'exp': ending_stats['exp'] - starting_stats['exp'],
-            'gp': ending_stats['gp'] - starting_stats['gp'],
-            'level': ending_stats['level'] - starting_stats['level']
-        }
+        ending_stats = self._ending_stats(results, plan, starting_stats, track_deltas)
+        if ending_stats is None:
+            response = self.get_stat_snapshot(max_age=None if track_deltas else 0)
+            if not response.get('success'):
+                if verbose:
+                    print(f"❌ Failed to get user stats: {response['error']}")
+                return {"success": False, "error": response['error']}
+            ending_stats = response['stats']
 
-        return {
-            "success": successful_scores == len(results),
-            "story_points": story_points,
-            "difficulty_breakdown": difficulties,
-            "results": results,
-            "successful_scores": successful_scores,
-            "stat_deltas": stat_deltas
-        }
+        return self._story_points_info(story_points, difficulties, plan, results, successful_scores,
+                                       starting_stats, ending_stats)
 
 
 # Convenience functions for backwards compatibility
@@ -443,13 +1098,15 @@ def press_minus(task_id: str, verbose: bool = True) -> Dict[str, Any]:
     return habitica.press_minus(task_id, verbose=verbose)
 
 
-def log_story_points(story_points: float, verbose: bool = True) -> Dict[str, Any]:
+def log_story_points(story_points: float, verbose: bool = True, aggregate: bool = False,
+                     track_deltas: bool = False) -> Dict[str, Any]:
     """
     Convenience function to quickly log story points.
     Requires HABITICA_USER_ID and HABITICA_API_TOKEN environment variables.
     """
     habitica = HabiticaAPI()
-    return habitica.log_story_points(story_points, verbose=verbose)
+    return habitica.log_story_points(story_points, verbose=verbose, aggregate=aggregate,
+                                     track_deltas=track_deltas)
 
 
 # Example usage
@@ -535,4 +1192,4 @@ if __name__ == "__main__":
     print("\n=== Example 7: No Callback (Backward Compatible) ===")
     habitica_normal = HabiticaAPI()
     normal_result = habitica_normal.press_plus("hard-doot")
-    print(f"✅ Normal scoring: {normal_result['success']}")
\ No newline at end of file
+    print(f"✅ Normal scoring: {normal_result['success']}")
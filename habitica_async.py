@@ -0,0 +1,587 @@
+"""
+Async Habitica API Library
+
+An asyncio version of HabiticaAPI built on httpx, so one event loop can score
+Habitica for several main loops at once without blocking Trello polling.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+import httpx
+
+from callback_dispatcher import CallbackDispatcher
+from habitica import HabiticaClientBase, HabiticaRateLimiter, Stats
+from habitica_cache import HabiticaTaskIndex
+
+
+class _TaskListNeeded(Exception):
+    """Raised inside a task index lookup that has to fetch the task list first."""
+
+
+def _defer_fetch() -> List[Dict[str, Any]]:
+    """Task index fetch that defers to the caller (the index only takes blocking fetches)."""
+    raise _TaskListNeeded()
+
+
+def _call_blocking(callback: Callable[..., Any], *args):
+    """Run a callback on a dispatcher worker, running it to completion if it is a coroutine function."""
+    outcome = callback(*args)
+    if inspect.iscoroutine(outcome):
+        asyncio.run(outcome)
+
+
+class AsyncHabiticaAPI(HabiticaClientBase):
+    """
+    An asyncio client for the Habitica API with the same surface as HabiticaAPI.
+
+    Every request method is a coroutine. Requests share one httpx.AsyncClient
+    with pooled keep-alive connections, and are paced by the same rate limiter
+    as the synchronous client. Alias resolution, breakdown validation and stat
+    deltas come from HabiticaClientBase, so they behave as in HabiticaAPI. The
+    callback may be a plain function or a coroutine function.
+
+    Usage:
+        async def my_callback(result, task_id, direction):
+            await notify(f"{task_id} scored")
+
+        async with AsyncHabiticaAPI(callback=my_callback) as habitica:
+            await habitica.press_plus("hard-doot")
+            await habitica.log_story_points(7, track_deltas=True)
+
+        # Several clients can share one connection pool
+        client = httpx.AsyncClient()
+        done_habitica = AsyncHabiticaAPI(client=client)
+        doing_habitica = AsyncHabiticaAPI(client=client)
+    """
+
+    # response.json() raises ValueError on a body that isn't JSON
+    TRANSPORT_ERRORS = (httpx.HTTPError, ValueError)
+
+    def __init__(self, user_id: Optional[str] = None, api_token: Optional[str] = None, load_env: bool = True,
+                 callback: Optional[Callable[[Dict[str, Any], str, str], Any]] = None,
+                 rate_limiter: Optional[HabiticaRateLimiter] = None, max_rate_limit_retries: int = 3,
+                 stats_max_age: float = 5.0, press_costs: Optional[Dict[str, float]] = None,
+                 task_index: Optional[HabiticaTaskIndex] = None, base_url: Optional[str] = None,
+                 callback_dispatcher: Optional[CallbackDispatcher] = None,
+                 client: Optional[httpx.AsyncClient] = None,
+                 max_connections: int = 10, timeout: float = 30.0):
+        """
+        Initialize the async Habitica API client.
+
+        Args:
+            user_id, api_token, load_env, callback, rate_limiter, max_rate_limit_retries,
+            stats_max_age, press_costs, task_index, base_url, callback_dispatcher:
+                    As for HabiticaAPI. The callback may be async; with a
+                    callback_dispatcher it runs to completion on a worker thread
+            client: httpx.AsyncClient to send requests with. If None, one is created
+                    (and closed by aclose())
+            max_connections: Connection pool size when creating the client
+            timeout: Request timeout in seconds when creating the client
+        """
+        super().__init__(user_id=user_id, api_token=api_token, load_env=load_env, callback=callback,
+                         rate_limiter=rate_limiter, max_rate_limit_retries=max_rate_limit_retries,
+                         stats_max_age=stats_max_age, press_costs=press_costs, task_index=task_index,
+                         base_url=base_url, callback_dispatcher=callback_dispatcher)
+
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            headers=self.headers,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+
+    async def __aenter__(self) -> 'AsyncHabiticaAPI':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the connection pool (only if this client created it)."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _request(self, method: str, url: str, spacing: float = 0.0,
+                       delay: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request paced by the rate limiter, retrying after a 429.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            spacing: Fallback spacing from the previous request while no
+                     rate-limit headers are available
+            delay: Fixed delay to sleep instead of asking the rate limiter
+            **kwargs: Passed through to httpx.AsyncClient.request
+
+        Returns:
+            The response (possibly still a 429 if retries ran out)
+        """
+        if delay is not None:
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await self._wait(spacing)
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code != 429:
+                return response
+
+            try:
+                wait = float(response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                reset_at = self.rate_limiter.reset_at
+                wait = reset_at - time.time() if reset_at else max(spacing, 1.0) * 2.0 ** attempt
+            self.rate_limiter.pause(wait)
+            await self._wait()
+
+        return response
+
+    async def _wait(self, spacing: float = 0.0):
+        """Wait for the rate limiter without blocking the event loop."""
+        delay = self.rate_limiter.reserve(spacing)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _run_callback(self, result: Dict[str, Any], task_id: str, direction: str, verbose: bool = True):
+        """Call (and await, if async) the callback if provided and this is a press_plus operation."""
+        if self.callback and direction == "up":
+            if self.callback_dispatcher is not None:
+                self.callback_dispatcher.submit(task_id, _call_blocking, self.callback, result, task_id, direction)
+                return
+            try:
+                outcome = self.callback(result, task_id, direction)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                if verbose:
+                    print(f"⚠️  Callback error: {e}")
+
+    async def get_profile(self, delay: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get user's profile information.
+
+        Args:
+            delay: Fixed delay in seconds before the request. If None, the rate
+                   limiter decides (PROFILE_SPACING when Habitica sends no headers)
+
+        Returns:
+            Dict containing user profile data
+        """
+        url = f"{self.base_url}/user"
+
+        try:
+            response = await self._request('GET', url, spacing=self.PROFILE_SPACING, delay=delay)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_stats(self, fields: Iterable[str] = HabiticaClientBase.STATS_FIELDS,
+                        delay: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the user's stats without downloading the whole user document.
+
+        Args:
+            fields: Habitica stat names to fetch
+            delay: Fixed delay in seconds before the request. If None, the rate limiter decides
+
+        Returns:
+            Dict with "success" and "stats" (a Stats object), or "error"
+        """
+        url = f"{self.base_url}/user"
+        params = {'userFields': ','.join(f"stats.{field}" for field in fields)}
+
+        try:
+            response = await self._request('GET', url, spacing=self.PROFILE_SPACING, delay=delay, params=params)
+            response.raise_for_status()
+            result = response.json()
+
+            if result.get('success'):
+                stats = result.get('data', {}).get('stats', {})
+                return {
+                    "success": True,
+                    "stats": Stats.from_dict(stats)
+                }
+            else:
+                return {"success": False, "error": "API returned success=False"}
+
+        except (httpx.HTTPError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_user_stats(self) -> Dict[str, Any]:
+        """
+        Get user's current stats (HP, XP, Gold, etc.).
+
+        Returns:
+            Dict containing user stats
+        """
+        url = f"{self.base_url}/user"
+        params = {'userFields': 'stats'}
+
+        try:
+            response = await self._request('GET', url, params=params)
+            response.raise_for_status()
+            result = response.json()
+
+            if result.get('success'):
+                stats = result.get('data', {}).get('stats', {})
+                return {
+                    "success": True,
+                    "stats": stats
+                }
+            else:
+                return {"success": False, "error": "API returned success=False"}
+
+        except (httpx.HTTPError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_stat_snapshot(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the exp/gp/level to compute stat deltas from (see HabiticaAPI.get_stat_snapshot).
+
+        Args:
+            max_age: Oldest score response to reuse, in seconds (default
+                     stats_max_age, 0 to always fetch)
+
+        Returns:
+            Dict with "success" and "stats" ({'exp', 'gp', 'level'}), or "error"
+        """
+        stats = self._recent_stats(max_age)
+        if stats is not None:
+            return {"success": True, "stats": stats}
+
+        response = await self.get_stats(fields=('exp', 'gp', 'lvl'))
+        if not response.get('success'):
+            return {"success": False, "error": response.get('error', 'Unknown error')}
+
+        stats = response['stats']
+        return {"success": True, "stats": {'exp': stats.exp, 'gp': stats.gp, 'level': stats.lvl}}
+
+    async def get_tasks(self, task_type: Optional[str] = None, cached: bool = False) -> Dict[str, Any]:
+        """
+        Get user's tasks.
+
+        Args:
+            task_type: Type of tasks to retrieve ('habits', 'dailys', 'todos', 'rewards')
+            cached: Serve the tasks from the task index (if configured) instead of
+                    refetching them
+
+        Returns:
+            Dict containing tasks data
+        """
+        if cached and self.task_index is not None:
+            try:
+                tasks = await self._with_task_list(lambda fetch: self.task_index.tasks(fetch, task_type))
+                return {"success": True, "data": tasks}
+            except (httpx.HTTPError, ValueError) as e:
+                return {"success": False, "error": str(e)}
+
+        url = f"{self.base_url}/tasks/user"
+        params = {}
+        if task_type:
+            params['type'] = task_type
+
+        try:
+            response = await self._request('GET', url, params=params)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+
+    async def _fetch_tasks(self) -> List[Dict[str, Any]]:
+        """Fetch every task for the task index, raising on failure."""
+        result = await self.get_tasks()
+        if not result.get('success'):
+            raise httpx.HTTPError(result.get('error', 'API returned success=False'))
+        return result.get('data', [])
+
+    async def _with_task_list(self, lookup: Callable[[Callable[[], List[Dict[str, Any]]]], Any]) -> Any:
+        """
+        Run a task index lookup, fetching the task list without blocking if it needs one.
+
+        Args:
+            lookup: Called with the fetch function to hand to the task index
+
+        Returns:
+            The lookup's result
+        """
+        try:
+            return lookup(_defer_fetch)
+        except _TaskListNeeded:
+            pass
+
+        try:
+            tasks = await self._fetch_tasks()
+        except (httpx.HTTPError, ValueError) as e:
+            error = e
+
+            def fail() -> List[Dict[str, Any]]:
+                raise error
+            return lookup(fail)
+        return lookup(lambda: tasks)
+
+    async def _resolve_task(self, task_id: str) -> Optional[str]:
+        """Resolve an alias to a task ID through the task index (None if the task doesn't exist)."""
+        if self.task_index is None:
+            return task_id
+        return await self._with_task_list(lambda fetch: self._lookup_task(task_id, fetch))
+
+    async def validate_breakdown(self, difficulties: Dict[str, int]) -> List[str]:
+        """
+        Check that the doots a breakdown would press exist, without scoring anything.
+
+        Args:
+            difficulties: Counts per difficulty, as returned by break_down_difficulty
+
+        Returns:
+            List of unknown doot aliases (always empty without a task index)
+        """
+        if self.task_index is None:
+            return []
+        return await self._with_task_list(lambda fetch: self._missing_doots(difficulties, fetch))
+
+    async def score_habit(
+        self,
+        task_id: str,
+        direction: str = "up",
+        verbose: bool = True,
+        delay: Optional[float] = None,
+        run_callback: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Score a doot (task component) using its task ID.
+
+        Args:
+            task_id: The task ID/alias of your doot
+            direction: "up" for + button, "down" for - button
+            verbose: Whether to print scoring results
+            delay: Fixed delay in seconds before the request. If None, the rate
+                   limiter decides (SCORE_SPACING when Habitica sends no headers)
+            run_callback: Whether to call the callback here (score_many calls it itself)
+
+        Returns:
+            Dict containing success status and response details
+        """
+        if direction not in ["up", "down"]:
+            raise ValueError("Direction must be 'up' or 'down'")
+
+        score_id = await self._resolve_task(task_id)
+        if score_id is None:
+            if verbose:
+                print(f"❌ Unknown doot {task_id}")
+            final_result = {
+                "success": False,
+                "task_id": task_id,
+                "direction": direction,
+                "error": f"No task with alias or ID {task_id}"
+            }
+            if run_callback:
+                await self._run_callback(final_result, task_id, direction, verbose)
+            return final_result
+
+        url = f"{self.base_url}/tasks/{score_id}/score/{direction}"
+
+        try:
+            response = await self._request('POST', url, spacing=self.SCORE_SPACING, delay=delay)
+            if response.status_code == 404 and self.task_index is not None:
+                # The task was deleted or recreated since the index was built
+                self.task_index.invalidate()
+                retry_id = await self._resolve_task(task_id)
+                if retry_id is not None and retry_id != score_id:
+                    url = f"{self.base_url}/tasks/{retry_id}/score/{direction}"
+                    response = await self._request('POST', url, spacing=self.SCORE_SPACING)
+            response.raise_for_status()
+
+            result = response.json()
+
+            if result.get('success'):
+                self._remember_stats(result.get('data', {}))
+                if verbose:
+                    self._print_score_result(result, direction, task_id)
+
+                final_result = {
+                    "success": True,
+                    "data": result.get('data', {}),
+                    "notifications": result.get('notifications', []),
+                    "task_id": task_id,
+                    "direction": direction
+                }
+            else:
+                if verbose:
+                    print(f"❌ Failed to score doot {task_id}")
+                final_result = {
+                    "success": False,
+                    "task_id": task_id,
+                    "direction": direction,
+                    "error": "API returned success=False"
+                }
+
+        except (httpx.HTTPError, ValueError) as e:
+            if verbose:
+                print(f"❌ Error scoring doot {task_id}: {e}")
+            final_result = {
+                "success": False,
+                "task_id": task_id,
+                "direction": direction,
+                "error": str(e)
+            }
+
+        if run_callback:
+            await self._run_callback(final_result, task_id, direction, verbose)
+
+        return final_result
+
+    async def press_plus(self, task_id: str, verbose: bool = True) -> Dict[str, Any]:
+        """Press the + button for a doot (the callback is awaited after scoring)."""
+        return await self.score_habit(task_id, "up", verbose=verbose)
+
+    async def press_minus(self, task_id: str, verbose: bool = True) -> Dict[str, Any]:
+        """Press the - button for a doot."""
+        return await self.score_habit(task_id, "down", verbose=verbose)
+
+    async def score_many(
+        self,
+        task_ids: List[str],
+        direction: str = "up",
+        verbose: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Score a planned sequence of doots back to back.
+
+        A sender task POSTs the presses one after another while this coroutine
+        prints results and awaits the callbacks in order, so a slow callback
+        doesn't hold up the next press.
+
+        Args:
+            task_ids: Task IDs/aliases to score, in order
+            direction: "up" for + button, "down" for - button
+            verbose: Whether to print scoring results
+
+        Returns:
+            List of score_habit results, in the order of task_ids
+        """
+        if direction not in ["up", "down"]:
+            raise ValueError("Direction must be 'up' or 'down'")
+
+        pending: "asyncio.Queue" = asyncio.Queue()
+
+        async def send():
+            try:
+                for task_id in task_ids:
+                    await pending.put(await self.score_habit(task_id, direction, verbose=False, run_callback=False))
+            except Exception as e:
+                await pending.put(e)
+
+        sender = asyncio.ensure_future(send())
+        results = []
+        try:
+            for task_id in task_ids:
+                result = await pending.get()
+                if isinstance(result, Exception):
+                    raise result
+
+                if verbose:
+                    if result['success']:
+                        self._print_score_result(result, direction, task_id)
+                    else:
+                        print(f"❌ Failed to score doot {task_id}: {result.get('error')}")
+                await self._run_callback(result, task_id, direction, verbose)
+                results.append(result)
+        finally:
+            if not sender.done():
+                sender.cancel()
+
+        return results
+
+    async def log_story_points(
+        self,
+        story_points: float,
+        verbose: bool = True,
+        aggregate: bool = False,
+        track_deltas: bool = False,
+        difficulties: Optional[Dict[str, int]] = None,
+        presses_done: int = 0,
+        starting_stats: Optional[Dict[str, Any]] = None,
+        on_press: Optional[Callable[[int], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Log story points to Habitica by breaking them down into difficulty levels.
+
+        Args:
+            story_points, verbose, aggregate, track_deltas, difficulties, presses_done,
+            starting_stats, on_press: As for HabiticaAPI.log_story_points. on_press
+                    may be async
+
+        Returns:
+            Dict containing results of all doot scoring
+        """
+        if presses_done and starting_stats is None:
+            raise ValueError("starting_stats is required to resume with presses_done")
+
+        if starting_stats is None:
+            response = await self.get_stat_snapshot(max_age=None if track_deltas else 0)
+            if not response.get('success'):
+                if verbose:
+                    print(f"❌ Failed to get user stats: {response['error']}")
+                return {"success": False, "error": response['error']}
+            starting_stats = response['stats']
+
+        if verbose:
+            print(f"📊 Logging {story_points} story points...")
+
+        if difficulties is None:
+            difficulties = self.break_down_difficulty(story_points, self.press_costs)
+        plan = self._plan(difficulties)
+
+        if verbose:
+            print(f"   Breakdown: {difficulties}")
+
+        unknown = await self.validate_breakdown(difficulties)
+        if unknown:
+            if verbose:
+                print(f"❌ Unknown doots: {', '.join(unknown)}")
+            return {"success": False, "error": f"Unknown doots: {', '.join(unknown)}"}
+
+        if aggregate and on_press is None:
+            results = await self.score_many(plan[presses_done:], verbose=False)
+        else:
+            results = []
+            for index in range(presses_done, len(plan)):
+                task_id = plan[index]
+                if verbose:
+                    print(f"   Scoring {task_id} ({index + 1}/{len(plan)})")
+
+                result = await self.press_plus(task_id, verbose=verbose)
+                results.append(result)
+                if on_press is not None:
+                    if not result.get('success'):
+                        break
+                    outcome = on_press(index + 1)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+
+        successful_scores = presses_done + sum(1 for r in results if r.get('success'))
+
+        if verbose:
+            print(f"✅ Logged {successful_scores}/{len(plan)} doots successfully")
+
+        # Get final stats after scoring
+        ending_stats = self._ending_stats(results, plan, starting_stats, track_deltas)
+        if ending_stats is None:
+            response = await self.get_stat_snapshot(max_age=None if track_deltas else 0)
+            if not response.get('success'):
+                if verbose:
+                    print(f"❌ Failed to get user stats: {response['error']}")
+                return {"success": False, "error": response['error']}
+            ending_stats = response['stats']
+
+        return self._story_points_info(story_points, difficulties, plan, results, successful_scores,
+                                       starting_stats, ending_stats)
@@ -0,0 +1,179 @@
+"""
+Habitica Task Index
+
+A TTL cache of the user's Habitica tasks indexed by alias and ID, so scoring
+can resolve aliases like "hard-doot" and reject unknown ones locally instead
+of spending a rate-limited request on them. The index can be persisted to
+disk so every notebook process shares one copy.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class HabiticaTaskIndex:
+    """
+    A thread-safe TTL cache of Habitica tasks keyed by alias and ID.
+
+    Usage:
+        index = HabiticaTaskIndex(path="habitica_tasks.json")
+        habitica = HabiticaAPI(task_index=index)
+
+        # Or directly, with any function returning the /tasks/user list
+        task = index.get("hard-doot", fetch=lambda: fetch_tasks())
+        missing = index.missing(["hard-doot", "easy-doot"], fetch)
+    """
+
+    def __init__(self, ttl: float = 3600.0, path: Optional[str] = None,
+                 min_refresh_interval: float = 60.0):
+        """
+        Initialize the index.
+
+        Args:
+            ttl (float): Seconds before the task list is refetched
+            path (Optional[str]): JSON file to persist the index to (None keeps it in memory)
+            min_refresh_interval (float): Minimum seconds between refreshes triggered by
+                                          a lookup miss, so unknown aliases can't cause a
+                                          refetch storm
+        """
+        self.ttl = ttl
+        self.path = path
+        self.min_refresh_interval = min_refresh_interval
+        self._tasks: List[Dict[str, Any]] = []
+        self._by_ref: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        """Load a persisted index (ignored if unreadable)."""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self._index(saved['tasks'], saved['fetched_at'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        """Persist the index atomically."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'fetched_at': self._fetched_at, 'tasks': self._tasks}, f)
+        os.replace(temp_path, self.path)
+
+    def _index(self, tasks: List[Dict[str, Any]], fetched_at: float):
+        by_ref = {}
+        for task in tasks:
+            by_ref[task['id']] = task
+            if task.get('alias'):
+                by_ref[task['alias']] = task
+        self._tasks = tasks
+        self._by_ref = by_ref
+        self._fetched_at = fetched_at
+
+    def refresh(self, fetch: Callable[[], List[Dict[str, Any]]]):
+        """
+        Refetch the task list.
+
+        Args:
+            fetch (Callable[[], List[Dict[str, Any]]]): Returns the user's tasks
+                                                        (the data of GET /tasks/user)
+        """
+        # Fetch outside the lock so a slow request doesn't block other lookups
+        tasks = fetch()
+        with self._lock:
+            # Wall-clock time so a persisted index ages correctly across processes
+            self._index(tasks, time.time())
+            if self.path:
+                self._save()
+
+    def _is_stale(self) -> bool:
+        return self._fetched_at is None or time.time() - self._fetched_at >= self.ttl
+
+    def get(self, task_ref: str, fetch: Callable[[], List[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a task by alias or ID.
+
+        The task list is refetched when it is older than ttl, or when the task is
+        missing and the last refresh is older than min_refresh_interval.
+
+        Args:
+            task_ref (str): Task alias or ID
+            fetch (Callable[[], List[Dict[str, Any]]]): Fetches the task list when needed
+
+        Returns:
+            Optional[Dict[str, Any]]: The task, or None if the user has no such task
+        """
+        with self._lock:
+            stale = self._is_stale()
+            task = None if stale else self._by_ref.get(task_ref)
+            recently_refreshed = (self._fetched_at is not None and
+                                  time.time() - self._fetched_at < self.min_refresh_interval)
+
+        if task is None and (stale or not recently_refreshed):
+            self.refresh(fetch)
+            with self._lock:
+                task = self._by_ref.get(task_ref)
+        return task
+
+    def resolve(self, task_ref: str, fetch: Callable[[], List[Dict[str, Any]]]) -> Optional[str]:
+        """
+        Resolve a task alias (or ID) to the task's ID.
+
+        Args:
+            task_ref (str): Task alias or ID
+            fetch (Callable[[], List[Dict[str, Any]]]): Fetches the task list when needed
+
+        Returns:
+            Optional[str]: The task ID, or None if the user has no such task
+        """
+        task = self.get(task_ref, fetch)
+        return task['id'] if task else None
+
+    def missing(self, task_refs: Iterable[str], fetch: Callable[[], List[Dict[str, Any]]]) -> List[str]:
+        """
+        Find which of several task aliases/IDs don't exist, without scoring anything.
+
+        Args:
+            task_refs (Iterable[str]): Task aliases or IDs
+            fetch (Callable[[], List[Dict[str, Any]]]): Fetches the task list when needed
+
+        Returns:
+            List[str]: The unknown references, in order
+        """
+        return [task_ref for task_ref in dict.fromkeys(task_refs) if self.get(task_ref, fetch) is None]
+
+    def tasks(self, fetch: Callable[[], List[Dict[str, Any]]],
+              task_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the cached task list, refetching it if it is older than ttl.
+
+        Args:
+            fetch (Callable[[], List[Dict[str, Any]]]): Fetches the task list when needed
+            task_type (Optional[str]): 'habits', 'dailys', 'todos' or 'rewards' (None for all)
+
+        Returns:
+            List[Dict[str, Any]]: The tasks
+        """
+        with self._lock:
+            stale = self._is_stale()
+        if stale:
+            self.refresh(fetch)
+
+        with self._lock:
+            tasks = list(self._tasks)
+        if task_type:
+            # The API takes plural type names, tasks carry singular ones ('dailys' -> 'daily')
+            singular = task_type[:-1]
+            tasks = [task for task in tasks if task.get('type') == singular]
+        return tasks
+
+    def invalidate(self):
+        """Drop the cached task list so the next lookup refetches it."""
+        with self._lock:
+            self._fetched_at = None
@@ -0,0 +1,355 @@
+"""
+Fake Habitica Server
+
+A local stand-in for the parts of the Habitica v3 API that habitica.py uses
+(/user, /tasks/user and /tasks/{id}/score/{direction}), so log_story_points
+and the Done-list pipeline can be load- and latency-tested without spending
+real quota. Scoring follows Habitica's habit math (task value drift, exp and
+gold by priority, level-ups), and latency, 429s and X-RateLimit-* headers can
+be injected.
+
+Usage:
+    # Standalone
+    python habitica_fake_server.py --latency 0.2 --rate-limit 30
+    HABITICA_BASE_URL=http://localhost:5050/api/v3 jupyter notebook
+
+    # In-process, e.g. from a benchmark script
+    with FakeHabiticaServer(FakeHabitica(latency=0.1)) as server:
+        habitica = HabiticaAPI(user_id='fake', api_token='fake', base_url=server.base_url)
+        habitica.log_story_points(7)
+"""
+
+import argparse
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, jsonify, request
+from werkzeug.serving import make_server
+
+# Habitica's task priority for each difficulty
+PRIORITIES = {'trivial': 0.1, 'easy': 1.0, 'medium': 1.5, 'hard': 2.0}
+
+
+class FakeHabitica:
+    """
+    The state and rules of the fake Habitica account.
+
+    One user with a "<difficulty>-doot" habit per difficulty. Every request
+    counts against a fixed rate-limit window like Habitica's (30 per minute);
+    once the window is used up requests get a 429 until it resets.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: int = 30,
+                 rate_window: float = 60.0, rate_limit_headers: bool = True,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Initialize the fake account.
+
+        Args:
+            latency: Seconds added to every response
+            jitter: Up to this many extra seconds added at random
+            rate_limit: Requests allowed per window (0 for no limit)
+            rate_window: Length of the rate-limit window in seconds
+            rate_limit_headers: Whether to send X-RateLimit-* headers
+            error_rate: Fraction of requests answered with a spurious 429
+            seed: Seed for the jitter and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.rate_limit_headers = rate_limit_headers
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Restore the starting stats and tasks and clear the request counters."""
+        with self._lock:
+            self.stats = {
+                'hp': 50.0, 'mp': 30.0, 'exp': 0.0, 'gp': 0.0, 'lvl': 1,
+                'maxHealth': 50, 'maxMP': 30, 'toNextLevel': self.exp_to_next_level(1),
+                'class': 'warrior', 'points': 0
+            }
+            self.tasks: List[Dict[str, Any]] = [
+                {'id': str(uuid.uuid4()), 'alias': f"{difficulty}-doot", 'text': f"{difficulty.title()} Doot",
+                 'type': 'habit', 'priority': priority, 'value': 0.0, 'up': True, 'down': True,
+                 'counterUp': 0, 'counterDown': 0}
+                for difficulty, priority in PRIORITIES.items()
+            ]
+            self.request_counts: Dict[str, int] = {}
+            self._window_start = time.time()
+            self._window_used = 0
+
+    @staticmethod
+    def exp_to_next_level(level: int) -> int:
+        """Habitica's toNextLevel formula."""
+        return round((level ** 2 * 0.25 + 10 * level + 139.75) / 10) * 10
+
+    def delay(self) -> float:
+        """Pick the latency for one response."""
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def admit(self, endpoint: str) -> Dict[str, Any]:
+        """
+        Count a request against the rate limit.
+
+        Args:
+            endpoint: Name the request is counted under in request_counts
+
+        Returns:
+            Dict with "allowed", "remaining" and "reset_at" (Unix time)
+        """
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_used = 0
+            reset_at = self._window_start + self.rate_window
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                allowed = False
+            elif self.rate_limit and self._window_used >= self.rate_limit:
+                allowed = False
+            else:
+                self._window_used += 1
+                allowed = True
+
+            remaining = max(0, self.rate_limit - self._window_used) if self.rate_limit else None
+            return {'allowed': allowed, 'remaining': remaining, 'reset_at': reset_at}
+
+    def find_task(self, task_ref: str) -> Optional[Dict[str, Any]]:
+        """Look up a task by ID or alias."""
+        for task in self.tasks:
+            if task_ref in (task['id'], task.get('alias')):
+                return task
+        return None
+
+    def score(self, task_ref: str, direction: str) -> Optional[Dict[str, Any]]:
+        """
+        Score a habit the way Habitica does.
+
+        Args:
+            task_ref: Task ID or alias
+            direction: "up" or "down"
+
+        Returns:
+            The response data (the user's stats plus the task's delta), or None
+            if there is no such task
+        """
+        with self._lock:
+            task = self.find_task(task_ref)
+            if task is None:
+                return None
+
+            # Task value drifts towards blue (up) or red (down), clamped like Habitica
+            value = min(max(task['value'], -47.27), 21.27)
+            if direction == 'up':
+                delta = 0.9747 ** value
+                task['counterUp'] += 1
+            else:
+                delta = -(0.9747 ** value)
+                task['counterDown'] += 1
+            task['value'] += delta
+
+            stats = self.stats
+            if direction == 'up':
+                stats['exp'] += round(delta * task['priority'] * 6)
+                stats['gp'] += delta * task['priority']
+                while stats['exp'] >= stats['toNextLevel']:
+                    stats['exp'] -= stats['toNextLevel']
+                    stats['lvl'] += 1
+                    stats['toNextLevel'] = self.exp_to_next_level(stats['lvl'])
+                    stats['hp'] = stats['maxHealth']
+            else:
+                stats['hp'] = max(0.0, stats['hp'] + delta * task['priority'] * 2)
+
+            return dict(stats, delta=delta, _tmp={})
+
+    def user(self, user_fields: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the /user document, optionally projected with userFields.
+
+        Args:
+            user_fields: Comma-separated fields, e.g. "stats" or "stats.exp,stats.gp"
+
+        Returns:
+            The user document
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        user = {'_id': 'fake-user', 'profile': {'name': 'Fake User'}, 'stats': stats}
+        if not user_fields:
+            return user
+
+        projected: Dict[str, Any] = {'_id': user['_id']}
+        for field in user_fields.split(','):
+            section, _, name = field.strip().partition('.')
+            if section not in user:
+                continue
+            if not name:
+                projected[section] = user[section]
+            elif name in user[section]:
+                projected.setdefault(section, {})[name] = user[section][name]
+        return projected
+
+    def list_tasks(self, task_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the tasks, optionally filtered by plural type ('habits', 'dailys', ...)."""
+        with self._lock:
+            tasks = [dict(task) for task in self.tasks]
+        if task_type:
+            tasks = [task for task in tasks if task['type'] == task_type[:-1]]
+        return tasks
+
+
+def _js_date(timestamp: float) -> str:
+    """Format a Unix time like JavaScript's Date.toString(), as Habitica sends X-RateLimit-Reset."""
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.strftime('%a %b %d %Y %H:%M:%S GMT+0000 (Coordinated Universal Time)')
+
+
+def create_app(fake: FakeHabitica) -> Flask:
+    """
+    Build the Flask app serving a fake account.
+
+    Args:
+        fake: The account state and rules
+
+    Returns:
+        The Flask app (routes under /api/v3)
+    """
+    app = Flask(__name__)
+
+    @app.before_request
+    def simulate():
+        delay = fake.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+        if not request.headers.get('x-api-user') or not request.headers.get('x-api-key'):
+            return jsonify({'success': False, 'error': 'NotAuthorized',
+                            'message': 'Missing authentication headers.'}), 401
+
+        endpoint = request.url_rule.endpoint if request.url_rule else 'unknown'
+        g.rate_limit = fake.admit(endpoint)
+        if not g.rate_limit['allowed']:
+            retry_after = max(1, round(g.rate_limit['reset_at'] - time.time()))
+            response = jsonify({'success': False, 'error': 'TooManyRequests',
+                                'message': 'You have made too many requests. Please wait and try again.'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
+    @app.after_request
+    def add_rate_limit_headers(response):
+        rate_limit = g.get('rate_limit')
+        if fake.rate_limit_headers and fake.rate_limit and rate_limit:
+            response.headers['X-RateLimit-Limit'] = str(fake.rate_limit)
+            response.headers['X-RateLimit-Remaining'] = str(rate_limit['remaining'])
+            response.headers['X-RateLimit-Reset'] = _js_date(rate_limit['reset_at'])
+        return response
+
+    @app.route('/api/v3/user', methods=['GET'])
+    def get_user():
+        """Return the user document (supports userFields)"""
+        return jsonify({'success': True, 'data': fake.user(request.args.get('userFields'))})
+
+    @app.route('/api/v3/tasks/user', methods=['GET'])
+    def get_tasks():
+        """Return the user's tasks (supports type)"""
+        return jsonify({'success': True, 'data': fake.list_tasks(request.args.get('type'))})
+
+    @app.route('/api/v3/tasks/<task_ref>/score/<direction>', methods=['POST'])
+    def score_task(task_ref, direction):
+        """Score a task up or down"""
+        if direction not in ('up', 'down'):
+            return jsonify({'success': False, 'error': 'BadRequest',
+                            'message': 'Direction must be "up" or "down".'}), 400
+
+        data = fake.score(task_ref, direction)
+        if data is None:
+            return jsonify({'success': False, 'error': 'NotFound',
+                            'message': 'Task not found.'}), 404
+        return jsonify({'success': True, 'data': data, 'notifications': []})
+
+    return app
+
+
+class FakeHabiticaServer:
+    """
+    Run the fake API on a background thread.
+
+    Usage:
+        with FakeHabiticaServer() as server:
+            habitica = HabiticaAPI(user_id='fake', api_token='fake', base_url=server.base_url)
+    """
+
+    def __init__(self, fake: Optional[FakeHabitica] = None, host: str = 'localhost', port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            fake: Account state and rules (a default FakeHabitica if None)
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+        """
+        self.fake = fake or FakeHabitica()
+        self._server = make_server(host, port, create_app(self.fake), threaded=True)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """The API base URL to give HabiticaAPI."""
+        return f"http://{self._server.host}:{self._server.port}/api/v3"
+
+    def start(self) -> 'FakeHabiticaServer':
+        """Start serving in the background."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'FakeHabiticaServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-in for the Habitica API')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5050)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra random seconds')
+    parser.add_argument('--rate-limit', type=int, default=30, help='requests per window (0 for no limit)')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='rate-limit window in seconds')
+    parser.add_argument('--no-rate-limit-headers', action='store_true', help="don't send X-RateLimit-* headers")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with a 429')
+    args = parser.parse_args()
+
+    fake = FakeHabitica(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                        rate_window=args.rate_window, rate_limit_headers=not args.no_rate_limit_headers,
+                        error_rate=args.error_rate)
+
+    print("Starting Fake Habitica Server...")
+    print("Available endpoints:")
+    print("  GET /api/v3/user?userFields=<fields> - User document")
+    print("  GET /api/v3/tasks/user?type=<habits|dailys|todos|rewards> - Tasks")
+    print("  POST /api/v3/tasks/<id or alias>/score/<up|down> - Score a task")
+    print(f"\nPoint HabiticaAPI at it with HABITICA_BASE_URL=http://{args.host}:{args.port}/api/v3")
+
+    create_app(fake).run(host=args.host, port=args.port, threaded=True)
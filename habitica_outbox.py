@@ -0,0 +1,402 @@
+"""
+Habitica Outbox
+
+A durable SQLite queue of story point jobs, drained by a background worker, so
+the Trello poll loop can hand off Habitica scoring and return immediately.
+Jobs survive kernel restarts, each press is checkpointed so a restart resumes
+where it stopped, and idempotency keys stop a card move from being scored twice.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, List, Callable
+
+from habitica import HabiticaAPI
+
+
+class _LeaseLost(Exception):
+    """Another worker took over a job whose lease expired."""
+
+
+class HabiticaOutbox:
+    """
+    A persistent queue of log_story_points jobs with a background worker.
+
+    Usage:
+        def on_done(job, habitica_info):
+            print(f"Logged {job['payload']['title']}: {habitica_info['stat_deltas']}")
+
+        outbox = HabiticaOutbox(habitica, on_done=on_done)
+        outbox.start()
+
+        # In the monitor callback: returns as soon as the job is on disk
+        key = HabiticaOutbox.move_key(card['id'], monitor.list_id, card['dateLastActivity'])
+        outbox.enqueue(story_points, key, payload={'title': card['name']})
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            story_points REAL NOT NULL,
+            plan TEXT NOT NULL,
+            payload TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            presses_done INTEGER NOT NULL DEFAULT 0,
+            start_stats TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            result TEXT,
+            owner TEXT,
+            claimed_at REAL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, habitica: HabiticaAPI, path: str = "habitica_outbox.db",
+                 on_done: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+                 max_attempts: int = 10, retry_delay: float = 5.0, max_retry_delay: float = 300.0,
+                 poll_interval: float = 1.0, lease_timeout: float = 300.0, verbose: bool = True):
+        """
+        Initialize the outbox.
+
+        Args:
+            habitica: Client used to score the jobs
+            path: SQLite database file
+            on_done: Called with (job, habitica_info) after a job is fully scored.
+                     habitica_info has the same keys as log_story_points() results
+            max_attempts: Failed attempts before a job is marked 'failed'
+            retry_delay: Delay before the first retry, doubled on each further failure
+            max_retry_delay: Ceiling for the retry delay
+            poll_interval: How often the idle worker checks for due retries
+            lease_timeout: Seconds a running job may go without a checkpoint before
+                           another worker (e.g. after a kernel restart) may take it over
+            verbose: Whether to print job progress
+        """
+        self.habitica = habitica
+        self.path = path
+        self.on_done = on_done
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.verbose = verbose
+        # Identifies this outbox's claims, so a second outbox on the same file
+        # never scores a job this one is still working on
+        self.owner = uuid.uuid4().hex
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(self.SCHEMA)
+            columns = {row['name'] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner', 'TEXT'), ('claimed_at', 'REAL')):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @staticmethod
+    def move_key(card_id: str, list_id: str, moved_at: Optional[str] = None) -> str:
+        """
+        Build the idempotency key for a card moving into a list.
+
+        Args:
+            card_id: The card ID
+            list_id: The list the card moved into
+            moved_at: When it moved (e.g. the card's dateLastActivity), so moving the
+                      same card into the same list again later counts as a new job
+
+        Returns:
+            The idempotency key
+        """
+        return ":".join(part for part in (card_id, list_id, moved_at) if part)
+
+    def enqueue(self, story_points: float, key: str, payload: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Queue story points to be logged.
+
+        The breakdown is planned now and stored with the job, so every retry
+        presses the same doots.
+
+        Args:
+            story_points: Number of story points to log
+            key: Idempotency key (see move_key). A job whose key is already queued
+                 or done is ignored
+            payload: JSON-serializable data handed back to on_done (card title, URL, ...)
+
+        Returns:
+            True if the job was queued, False if the key was already known
+        """
+        difficulties = self.habitica.break_down_difficulty(story_points, self.habitica.press_costs)
+        plan = [f"{difficulty}-doot"
+                for difficulty, count in difficulties.items()
+                for _ in range(count)]
+
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO jobs (key, story_points, plan, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, story_points, json.dumps(plan), json.dumps(payload or {}), now, now)
+            )
+        queued = cursor.rowcount == 1
+
+        if queued:
+            self._wakeup.set()
+        elif self.verbose:
+            print(f"⏭️  Habitica job {key} already queued, skipping")
+        return queued
+
+    def start(self):
+        """Start the background worker."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background worker after its current press.
+
+        Args:
+            timeout: Seconds to wait for the worker to stop (None to wait indefinitely)
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no job is pending or running (failed jobs don't count).
+
+        Args:
+            timeout: Seconds to wait at most (None to wait indefinitely)
+
+        Returns:
+            True if the outbox drained in time
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.pending_count() > 0:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def pending_count(self) -> int:
+        """Get the number of jobs waiting to be scored (including retries)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()
+        return row[0]
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List jobs, oldest first.
+
+        Args:
+            status: Only return jobs with this status ('pending', 'running', 'done', 'failed')
+
+        Returns:
+            The jobs
+        """
+        query = "SELECT * FROM jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY id", params).fetchall()
+        return [self._job_from_row(row) for row in rows]
+
+    def retry_failed(self) -> int:
+        """
+        Put every failed job back in the queue with a fresh attempt count.
+
+        Returns:
+            The number of jobs requeued
+        """
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0 "
+                "WHERE status = 'failed'"
+            )
+        if cursor.rowcount:
+            self._wakeup.set()
+        return cursor.rowcount
+
+    def process_next(self) -> bool:
+        """
+        Score the next due job on the calling thread.
+
+        Returns:
+            True if a job was processed (successfully or not)
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        self._process(job)
+        return True
+
+    def _run(self):
+        """Worker loop: process due jobs until stopped."""
+        while not self._stopping.is_set():
+            try:
+                processed = self.process_next()
+            except Exception as e:
+                print(f"⚠️  Habitica outbox error: {e}")
+                processed = False
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest due job and return it.
+
+        A running job is only taken over once its lease has expired, i.e. the
+        worker holding it died (a job that was running when the process died
+        resumes from its checkpoint).
+        """
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                "OR (status = 'running' AND (claimed_at IS NULL OR claimed_at < ?)) "
+                "ORDER BY id LIMIT 1",
+                (now, now - self.lease_timeout)
+            ).fetchone()
+            if row is None:
+                return None
+            # Only take the job if nobody else claimed it since the SELECT
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, claimed_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND claimed_at IS ?",
+                (self.owner, now, now, row['id'], row['status'], row['claimed_at'])
+            )
+            if cursor.rowcount != 1:
+                return None
+        return self._job_from_row(row)
+
+    def _update(self, job_id: int, **fields) -> bool:
+        """
+        Persist changes to a job this outbox holds the lease on.
+
+        Returns:
+            False if another worker has taken the job over
+        """
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ?",
+                (*fields.values(), job_id, self.owner)
+            )
+        return cursor.rowcount == 1
+
+    def _checkpoint(self, job: Dict[str, Any], **fields):
+        """Persist progress and renew the job's lease, or stop if it was lost."""
+        if not self._update(job['id'], claimed_at=time.time(), **fields):
+            raise _LeaseLost(f"Habitica job {job['key']} was taken over by another worker")
+
+    def _process(self, job: Dict[str, Any]):
+        """Score a job's remaining presses, checkpointing after each one."""
+        habitica = self.habitica
+        plan = job['plan']
+
+        try:
+            start_stats = job['start_stats']
+            if job['presses_done'] == 0:
+                # Nothing scored yet, so take a fresh baseline: a retry can run
+                # minutes after the last attempt
+                response = habitica.get_stat_snapshot(max_age=0)
+                if not response.get('success'):
+                    raise RuntimeError(f"Failed to get user stats: {response['error']}")
+                start_stats = response['stats']
+                self._checkpoint(job, start_stats=json.dumps(start_stats))
+
+            if self.verbose and job['presses_done'] == 0:
+                print(f"📊 Logging {job['story_points']} story points ({job['key']})...")
+
+            habitica_info = habitica.log_story_points(
+                job['story_points'], verbose=False, track_deltas=True,
+                difficulties=self._breakdown(plan), presses_done=job['presses_done'],
+                starting_stats=start_stats,
+                on_press=lambda presses_done: self._checkpoint(job, presses_done=presses_done)
+            )
+            if not habitica_info['success']:
+                raise RuntimeError(habitica_info.get('error', 'Unknown error'))
+
+        except _LeaseLost as e:
+            if self.verbose:
+                print(f"⚠️  {e}, stopping")
+            return
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        if not self._update(job['id'], status='done', last_error=None,
+                            result=json.dumps({k: v for k, v in habitica_info.items() if k != 'results'})):
+            if self.verbose:
+                print(f"⚠️  Habitica job {job['key']} was taken over by another worker, stopping")
+            return
+
+        if self.verbose:
+            print(f"✅ Logged {len(plan)} doots for {job['key']}")
+
+        if self.on_done:
+            try:
+                self.on_done(job, habitica_info)
+            except Exception as e:
+                if self.verbose:
+                    print(f"⚠️  Outbox on_done error: {e}")
+
+    def _fail(self, job: Dict[str, Any], error: Exception):
+        """Record a failed attempt and schedule a retry (or give up)."""
+        attempts = job['attempts'] + 1
+        if attempts >= self.max_attempts:
+            if not self._update(job['id'], status='failed', attempts=attempts, last_error=str(error)):
+                return
+            if self.verbose:
+                print(f"❌ Habitica job {job['key']} failed after {attempts} attempts: {error}")
+            return
+
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+        if not self._update(job['id'], status='pending', attempts=attempts, last_error=str(error),
+                            next_attempt_at=time.time() + delay):
+            return
+        if self.verbose:
+            print(f"⚠️  Habitica job {job['key']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+
+    @staticmethod
+    def _breakdown(plan: List[str]) -> Dict[str, int]:
+        """Count the presses of a plan per difficulty."""
+        counts = {'hard': 0, 'medium': 0, 'easy': 0, 'trivial': 0}
+        for task_id in plan:
+            counts[task_id.rsplit('-', 1)[0]] += 1
+        return counts
+
+    @staticmethod
+    def _job_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Decode a jobs row."""
+        job = dict(row)
+        for field in ('plan', 'payload', 'start_stats', 'result'):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
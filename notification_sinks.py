@@ -0,0 +1,294 @@
+"""
+Notification Sinks
+
+One interface for the ways the main loops signal progress: IFTTT phone
+notifications, Ubuntu desktop notifications, the stack server that plays doot
+sounds in the frontend, and an in-memory recorder for offline throughput
+tests. A NotificationDispatcher fans each notification out to every sink
+concurrently, so one slow sink doesn't delay the others.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from callback_dispatcher import CallbackDispatcher
+from IFTTT import IFTTTNotifier
+from stack_client import StackClient
+import ubuntu_desktop
+
+# Notification kinds: a card changed state, or a single Habitica doot was scored
+KINDS = ('card', 'doot')
+
+
+class NotificationSink:
+    """
+    Base class for a notification destination.
+
+    Subclasses implement send(). A sink only receives the kinds of
+    notification listed in its kinds.
+    """
+
+    # Kinds this sink receives unless told otherwise
+    DEFAULT_KINDS = KINDS
+
+    def __init__(self, name: Optional[str] = None, kinds: Optional[Iterable[str]] = None,
+                 timeout: Optional[float] = 10.0):
+        """
+        Initialize the sink.
+
+        Args:
+            name: Name used in logs (default: class name)
+            kinds: Kinds of notification to receive ('card', 'doot')
+            timeout: Seconds a send may take before the dispatcher reports it as slow (None to never report)
+        """
+        self.name = name or type(self).__name__
+        self.kinds = tuple(kinds if kinds is not None else self.DEFAULT_KINDS)
+        self.timeout = timeout
+
+    def send(self, kind: str, title: str, message: str = "", url: Optional[str] = None,
+             level: Optional[str] = None, key: Optional[str] = None,
+             info: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Deliver a notification.
+
+        Args:
+            kind: 'card' or 'doot'
+            title: Notification title
+            message: Notification message
+            url: Link to the card
+            level: Doot difficulty ('trivial', 'easy', 'medium', 'hard')
+            key: Identifies what the notification is about (e.g. the card ID)
+            info: Structured details (title, story_points, exp, gp)
+
+        Returns:
+            True if delivered
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the sink's resources."""
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class IFTTTSink(NotificationSink):
+    """Phone notifications through an IFTTTNotifier (keeps its queueing, coalescing and digests)."""
+
+    DEFAULT_KINDS = ('card',)
+
+    def __init__(self, notifier: Optional[IFTTTNotifier] = None, **kwargs):
+        """
+        Args:
+            notifier: The notifier to send with (a default IFTTTNotifier if None)
+            **kwargs: As for NotificationSink
+        """
+        super().__init__(**kwargs)
+        self.notifier = notifier or IFTTTNotifier()
+
+    def send(self, kind, title, message="", url=None, level=None, key=None, info=None) -> bool:
+        result = self.notifier.send_notification(title=title, message=message, url=url or "",
+                                                 coalesce_key=key, digest_info=info)
+        return result["success"]
+
+    def close(self):
+        self.notifier.flush(self.notifier.exit_timeout)
+
+
+class DesktopSink(NotificationSink):
+    """Ubuntu desktop notifications (notify-send), with Balatro sounds for doots."""
+
+    DEFAULT_KINDS = ('card',)
+
+    def __init__(self, urgency: str = 'normal', display_ms: int = 5000, sounds: bool = True, **kwargs):
+        """
+        Args:
+            urgency: 'low', 'normal' or 'critical'
+            display_ms: How long the notification stays up, in milliseconds
+            sounds: Whether doots play their difficulty's sound
+            **kwargs: As for NotificationSink
+        """
+        super().__init__(**kwargs)
+        self.urgency = urgency
+        self.display_ms = display_ms
+        self.sounds = sounds
+
+    def send(self, kind, title, message="", url=None, level=None, key=None, info=None) -> bool:
+        if kind == 'doot' and self.sounds and level:
+            return bool(ubuntu_desktop.send_balatro_notification(
+                title, message, event_type=f"{level}-doot", notification=True,
+                urgency=self.urgency, timeout=self.display_ms))
+        return ubuntu_desktop.send_notification(title, message, urgency=self.urgency, timeout=self.display_ms)
+
+
+class StackSink(NotificationSink):
+    """Pushes each doot's difficulty onto the stack server, which the frontend plays."""
+
+    DEFAULT_KINDS = ('doot',)
+
+    def __init__(self, client: Optional[StackClient] = None, **kwargs):
+        """
+        Args:
+            client: Stack server client (a default StackClient if None)
+            **kwargs: As for NotificationSink
+        """
+        super().__init__(**kwargs)
+        self.client = client or StackClient()
+
+    def send(self, kind, title, message="", url=None, level=None, key=None, info=None) -> bool:
+        if not level:
+            return True  # Nothing to play
+        try:
+            self.client.add_level(level)
+        except requests.RequestException:
+            return False
+        return True
+
+
+class RecordingSink(NotificationSink):
+    """
+    Records notifications in memory instead of sending them.
+
+    Usage:
+        recorder = RecordingSink(latency=0.2)
+        sinks = NotificationDispatcher([recorder])
+        ...
+        recorder.wait_for(10, timeout=30)
+        print(recorder.records[-1]['delivered_at'] - start)
+    """
+
+    def __init__(self, latency: float = 0.0, fail: bool = False, **kwargs):
+        """
+        Args:
+            latency: Seconds each send takes, to stand in for a real sink
+            fail: Whether sends report failure
+            **kwargs: As for NotificationSink
+        """
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.fail = fail
+        self.records: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+
+    def send(self, kind, title, message="", url=None, level=None, key=None, info=None) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._condition:
+            self.records.append({
+                'kind': kind, 'title': title, 'message': message, 'url': url, 'level': level,
+                'key': key, 'info': info, 'delivered_at': time.time()
+            })
+            self._condition.notify_all()
+        return not self.fail
+
+    def wait_for(self, count: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until at least count notifications have been recorded.
+
+        Args:
+            count: Number of records to wait for
+            timeout: Seconds to wait at most (None to wait indefinitely)
+
+        Returns:
+            True if the records arrived in time
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.records) >= count, timeout)
+
+    def clear(self):
+        """Forget the recorded notifications."""
+        with self._condition:
+            self.records.clear()
+
+
+class NotificationDispatcher:
+    """
+    Fans notifications out to several sinks concurrently.
+
+    Each sink gets its own ordered lane with its own timeout, so a slow or dead
+    sink only delays its own notifications. notify() never blocks on a sink.
+
+    Usage:
+        sinks = NotificationDispatcher([IFTTTSink(), StackSink(), DesktopSink(kinds=())])
+        habitica = HabiticaAPI(callback=sinks.habitica_callback)
+        sinks.notify('card', 'Trello Card Logged!', message, url=card_url, key=card_id)
+    """
+
+    def __init__(self, sinks: Iterable[NotificationSink], max_pending: int = 100,
+                 exit_timeout: Optional[float] = 10.0, verbose: bool = True):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            sinks: The sinks to deliver to
+            max_pending: Deliveries allowed to wait across all sinks; beyond this new ones are dropped
+            exit_timeout: Seconds to spend delivering pending notifications at exit
+            verbose: Whether to print failed, slow and dropped deliveries
+        """
+        self.sinks = list(sinks)
+        self.verbose = verbose
+        self._dispatcher = CallbackDispatcher(max_workers=max(1, len(self.sinks)), max_pending=max_pending,
+                                              exit_timeout=exit_timeout, verbose=verbose)
+
+    def notify(self, kind: str, title: str, message: str = "", url: Optional[str] = None,
+               level: Optional[str] = None, key: Optional[str] = None,
+               info: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Queue a notification for every sink that receives its kind.
+
+        Args:
+            kind, title, message, url, level, key, info: As for NotificationSink.send
+
+        Returns:
+            Number of sinks the notification was queued for
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind '{kind}'. Must be one of: {list(KINDS)}")
+
+        queued = 0
+        for sink in self.sinks:
+            if kind in sink.kinds:
+                queued += self._dispatcher.submit_with_timeout(
+                    sink, sink.timeout, self._send, sink, kind, title, message, url, level, key, info)
+        return queued
+
+    def _send(self, sink: NotificationSink, *args):
+        if not sink.send(*args) and self.verbose:
+            print(f"❌ {sink.name} failed to deliver: {args[1]}")
+
+    def habitica_callback(self, result: Dict[str, Any], task_id: str, direction: str):
+        """
+        HabiticaAPI callback announcing each scored doot.
+
+        Args:
+            result, task_id, direction: As passed by HabiticaAPI ("hard-doot" -> level "hard")
+        """
+        level = task_id[:-len('-doot')] if task_id.endswith('-doot') else None
+        self.notify('doot', f"+ {task_id}", level=level, key=task_id,
+                    info=result.get('data') if result.get('success') else None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every sink has handled its queued notifications.
+
+        Args:
+            timeout: Seconds to wait at most (None to wait indefinitely)
+
+        Returns:
+            True if everything was handled in time
+        """
+        return self._dispatcher.drain(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Deliver what is pending, then close every sink.
+
+        Args:
+            timeout: Seconds to wait for pending notifications (None to wait indefinitely)
+        """
+        self._dispatcher.close(timeout)
+        for sink in self.sinks:
+            sink.close()
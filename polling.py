@@ -0,0 +1,204 @@
+"""
+Polling Interval Policies
+
+Pluggable policies deciding how long the monitor() loops wait between polls,
+plus counters for tuning them, and the poll loop those monitors share.
+"""
+
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+
+class IntervalPolicy:
+    """
+    Base class for monitor() interval policies.
+
+    A policy is asked for the next wait after every poll, told whether that
+    poll detected a change, and keeps stats on how it behaved.
+    """
+
+    def __init__(self, interval: float):
+        """
+        Initialize the policy.
+
+        Args:
+            interval (float): Wait before the first poll, in seconds. Also the baseline
+                              a fixed-interval loop would use, for the polls_saved stat
+        """
+        self.interval = interval
+        self.baseline_interval = interval
+        self.polls = 0
+        self.changes = 0
+        self.waited = 0.0
+
+    def next_interval(self, changed: bool) -> float:
+        """
+        Record the outcome of a poll and return the wait before the next one.
+
+        Args:
+            changed (bool): Whether the poll detected any changes
+
+        Returns:
+            float: Seconds to wait before the next poll
+        """
+        self.polls += 1
+        if changed:
+            self.changes += 1
+        wait = self._next_wait(changed)
+        self.waited += wait
+        return wait
+
+    def _next_wait(self, changed: bool) -> float:
+        """Compute the next wait. Subclasses override this."""
+        return self.interval
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get polling statistics.
+
+        Returns:
+            Dict[str, float]: 'polls', 'changes', 'waited' (seconds) and 'polls_saved',
+                              the number of polls a fixed baseline_interval loop would
+                              have made over the same time minus the polls actually made
+        """
+        baseline_polls = int(self.waited / self.baseline_interval) if self.baseline_interval > 0 else self.polls
+        return {
+            'polls': self.polls,
+            'changes': self.changes,
+            'waited': round(self.waited, 1),
+            'polls_saved': max(0, baseline_polls - self.polls)
+        }
+
+    def print_stats(self):
+        """Pretty print the polling statistics."""
+        stats = self.stats()
+        print(f"📈 {stats['polls']} polls, {stats['changes']} with changes, "
+              f"{stats['polls_saved']} saved vs. every {self.baseline_interval}s")
+
+    def __str__(self) -> str:
+        return f"{self.interval} seconds"
+
+
+class FixedInterval(IntervalPolicy):
+    """Always wait the same interval (the original monitor() behaviour)."""
+
+
+class AdaptiveInterval(IntervalPolicy):
+    """
+    Back off exponentially while idle and snap back to a fast interval after a change.
+
+    Usage:
+        policy = AdaptiveInterval(min_interval=1.0, max_interval=30.0)
+        monitor.monitor(interval_policy=policy, callback=handle_trello_changes)
+        policy.print_stats()
+    """
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 30.0,
+                 backoff: float = 1.5, jitter: float = 0.1, idle_polls: int = 3):
+        """
+        Initialize the adaptive policy.
+
+        Args:
+            min_interval (float): Fast interval used right after a change (and the baseline)
+            max_interval (float): Ceiling the idle backoff grows to
+            backoff (float): Multiplier applied to the interval for each idle poll
+            jitter (float): Random +/- fraction applied to each wait
+            idle_polls (int): Polls to stay at min_interval after a change before backing off
+        """
+        super().__init__(min_interval)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.idle_polls = idle_polls
+        self._idle_streak = 0
+
+    def _next_wait(self, changed: bool) -> float:
+        if changed:
+            self._idle_streak = 0
+            self.interval = self.min_interval
+        else:
+            self._idle_streak += 1
+            if self._idle_streak > self.idle_polls:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+
+        wait = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, wait)
+
+    def __str__(self) -> str:
+        return f"{self.min_interval}-{self.max_interval} seconds (adaptive)"
+
+
+def poll_loop(fetch: Callable[[], Any], on_tick: Callable[[Any, Any], bool],
+              policy: IntervalPolicy, max_iterations: Optional[int] = None,
+              watermark: Optional[Callable[[], Any]] = None,
+              on_start: Optional[Callable[[Any], None]] = None,
+              verbose: bool = True, print_stats: bool = False):
+    """
+    Run a monitor() loop until max_iterations or Ctrl+C.
+
+    Args:
+        fetch (Callable[[], Any]): Returns the current state (e.g. the cards)
+        on_tick (Callable[[Any, Any], bool]): Called with (previous, current) state after
+                                              each fetch; returns whether anything changed
+        policy (IntervalPolicy): Decides the wait between polls
+        max_iterations (Optional[int]): Maximum number of iterations (None for infinite)
+        watermark (Optional[Callable[[], Any]]): Cheap check run before each fetch; the
+                                                 fetch is skipped while its value is unchanged
+        on_start (Optional[Callable[[Any], None]]): Called with the initial state when verbose
+        verbose (bool): Whether to print status information
+        print_stats (bool): Print the policy's stats when stopped with Ctrl+C
+    """
+    # Get initial state (watermark first, so a change racing the fetch shows up next tick)
+    last_watermark = None
+    try:
+        if watermark:
+            last_watermark = watermark()
+        previous = fetch()
+        if verbose and on_start:
+            on_start(previous)
+    except requests.RequestException as e:
+        print(f"Error fetching initial state: {e}")
+        return
+
+    iteration = 0
+    delay = policy.interval
+    try:
+        while max_iterations is None or iteration < max_iterations:
+            time.sleep(delay)
+            iteration += 1
+            has_changes = False
+
+            try:
+                if watermark:
+                    current_watermark = watermark()
+                    if current_watermark == last_watermark:
+                        if verbose:
+                            print(".", end='')  # Nothing moved, skip the full fetch
+                        delay = policy.next_interval(False)
+                        continue
+
+                current = fetch()
+
+                if verbose:
+                    print(".", end='')  # Print a dot for each iteration
+
+                has_changes = on_tick(previous, current)
+                previous = current
+                if watermark:
+                    last_watermark = current_watermark
+
+            except requests.RequestException as e:
+                if verbose:
+                    print(f"Error fetching cards: {e}")
+
+            delay = policy.next_interval(has_changes)
+
+    except KeyboardInterrupt:
+        if verbose:
+            print("\nMonitoring stopped by user")
+            if print_stats:
+                policy.print_stats()
@@ -1,15 +1,123 @@
-from flask import Flask, request, jsonify
+import json
+import threading
+import uuid
+from collections import deque
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend access
 
-# In-memory stack storage
-stack = []
-
 # Valid difficulty levels
 VALID_LEVELS = ['trivial', 'hard', 'easy', 'medium']
 
+# Most entries the stack holds, and what happens when it is full:
+#   'drop_oldest' - one entry per item, the oldest item is dropped
+#   'collapse'    - repeats of a level are stored as one counted entry, the
+#                   oldest entry is dropped only if the stack is still full
+STACK_CAPACITY = 1000
+OVERFLOW_POLICY = 'drop_oldest'
+
+# Pushes remembered for /stack/events clients resuming with Last-Event-ID
+EVENT_HISTORY_SIZE = 1000
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE = 15
+
+
+class StackBuffer:
+    """
+    A bounded, thread-safe ring buffer of levels with an atomic drain.
+
+    Every push gets a sequence number, so clients can tell which items are new
+    even after older ones were dropped or drained. Sequence numbers restart
+    from 0 with every buffer, so each buffer also gets a random epoch; clients
+    compare (epoch, seq) to notice a server restart. Pushes are O(1). The last
+    EVENT_HISTORY_SIZE pushes are also kept (even once drained) for event
+    streams to resume from.
+    """
+
+    OVERFLOW_POLICIES = ('drop_oldest', 'collapse')
+
+    def __init__(self, capacity=STACK_CAPACITY, overflow=OVERFLOW_POLICY, history_size=EVENT_HISTORY_SIZE):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Must be one of: {list(self.OVERFLOW_POLICIES)}")
+        self.capacity = capacity
+        self.overflow = overflow
+        # Entries are [level, count, last_seq]; count is always 1 unless collapsing
+        self._entries = deque()
+        self._size = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._dropped = 0
+        self._history = deque(maxlen=history_size)  # (seq, level)
+        self._lock = threading.Condition()
+
+    def push(self, level):
+        """Add a level and return (stack size, its sequence number)"""
+        with self._lock:
+            self._seq += 1
+            last = self._entries[-1] if self._entries else None
+            if self.overflow == 'collapse' and last is not None and last[0] == level:
+                last[1] += 1
+                last[2] = self._seq
+            else:
+                if len(self._entries) >= self.capacity:
+                    dropped_count = self._entries.popleft()[1]
+                    self._size -= dropped_count
+                    self._dropped += dropped_count
+                self._entries.append([level, 1, self._seq])
+            self._size += 1
+            self._history.append((self._seq, level))
+            self._lock.notify_all()
+            return self._size, self._seq
+
+    def drain(self):
+        """Remove and return every item in one step, as a snapshot dict"""
+        with self._lock:
+            snapshot = self._snapshot()
+            self._entries = deque()
+            self._size = 0
+            return snapshot
+
+    def snapshot(self):
+        """Return every item without removing them"""
+        with self._lock:
+            return self._snapshot()
+
+    def last_seq(self):
+        """Return the sequence number of the newest push"""
+        with self._lock:
+            return self._seq
+
+    def events_since(self, seq, timeout=None):
+        """Wait up to timeout for pushes after seq and return them as (seq, level) pairs"""
+        with self._lock:
+            self._lock.wait_for(lambda: self._seq > seq, timeout)
+            # Newest first until we reach what the client has seen; pushes older
+            # than the history are gone and the client gets what is left
+            events = []
+            for event in reversed(self._history):
+                if event[0] <= seq:
+                    break
+                events.append(event)
+            events.reverse()
+            return events
+
+    def _snapshot(self):
+        return {
+            'items': [level for level, count, _ in self._entries for _ in range(count)],
+            'size': self._size,
+            'epoch': self.epoch,
+            'last_seq': self._seq,
+            'dropped': self._dropped
+        }
+
+
+# In-memory stack storage
+stack = StackBuffer()
+
 @app.route('/stack', methods=['POST'])
 def add_to_stack():
     """Add an item to the stack via POST request"""
@@ -28,12 +136,13 @@ def add_to_stack():
         }), 400
     
     # Add to stack
-    stack.append(level)
+    stack_size, seq = stack.push(level)
     
     return jsonify({
         'message': f'Added "{level}" to stack',
-        'stack_size': len(stack),
-        'current_stack': stack.copy()
+        'stack_size': stack_size,
+        'epoch': stack.epoch,
+        'seq': seq
     }), 201
 
 @app.route('/stack', methods=['GET'])
@@ -49,24 +158,69 @@ def get_and_clear_stack():
             'received': level
         }), 400
     
-    # Get current stack and clear it
-    current_stack = stack.copy()
-    stack.clear()
+    # Get current stack and clear it in one step, so no concurrent POST is lost
+    drained = stack.drain()
     
     return jsonify({
         'message': 'Stack retrieved and cleared',
-        'stack': current_stack,
-        'stack_size': len(current_stack)
+        'stack': drained['items'],
+        'stack_size': drained['size'],
+        'epoch': drained['epoch'],
+        'last_seq': drained['last_seq'],
+        'dropped': drained['dropped']
     }), 200
 
 @app.route('/stack/status', methods=['GET'])
 def get_stack_status():
     """Get current stack status without clearing it"""
+    current = stack.snapshot()
     return jsonify({
-        'current_stack': stack.copy(),
-        'stack_size': len(stack)
+        'current_stack': current['items'],
+        'stack_size': current['size'],
+        'epoch': current['epoch'],
+        'last_seq': current['last_seq'],
+        'dropped': current['dropped']
     }), 200
 
+def _resume_seq(last_event_id):
+    """Turn an '<epoch>:<seq>' event id into the sequence number to resume after"""
+    if not last_event_id:
+        # New client: only pushes from now on
+        return stack.last_seq()
+    epoch, _, seq = last_event_id.rpartition(':')
+    try:
+        seq = int(seq)
+    except ValueError:
+        return stack.last_seq()
+    if (epoch and epoch != stack.epoch) or seq > stack.last_seq():
+        # The server restarted since the client's last event: everything is new
+        return 0
+    return seq
+
+@app.route('/stack/events', methods=['GET'])
+def stream_stack_events():
+    """Stream each new level as a Server-Sent Event, resuming after Last-Event-ID"""
+    # Browsers send Last-Event-ID when reconnecting; the query parameter covers the first connect
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_seq = _resume_seq(last_event_id)
+
+    def generate(last_seq):
+        yield 'retry: 2000\n\n'
+        while True:
+            events = stack.events_since(last_seq, timeout=EVENT_KEEPALIVE)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for seq, level in events:
+                data = json.dumps({'level': level, 'epoch': stack.epoch, 'seq': seq})
+                yield f"id: {stack.epoch}:{seq}\nevent: level\ndata: {data}\n\n"
+            last_seq = events[-1][0]
+
+    return Response(generate(last_seq), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Don't let a reverse proxy hold events back
+    })
+
 if __name__ == '__main__':
     print("Starting Stack Server...")
     print("Available endpoints:")
@@ -74,6 +228,8 @@ if __name__ == '__main__':
     print("  POST /stack with JSON: {'level': '<trivial|hard|easy|medium>'} - Add to stack")
     print("  GET /stack?level=<trivial|hard|easy|medium> - Get and clear stack")
     print("  GET /stack/status - View current stack without clearing")
+    print("  GET /stack/events - Stream new levels as Server-Sent Events")
     print("\nServer running on http://localhost:5000")
     
-    app.run(debug=True, host='localhost', port=5000)
\ No newline at end of file
+    # Threaded, so open event streams don't block other requests
+    app.run(debug=True, host='localhost', port=5000, threaded=True)
\ No newline at end of file
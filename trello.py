@@ -12,6 +12,14 @@ import os
 from dotenv import load_dotenv
 import random
 
+from polling import FixedInterval, IntervalPolicy, poll_loop
+from trello_cache import TrelloMetadataCache, get_shared_cache
+from trello_session import TrelloBatchError, TrelloSession, get_shared_session
+
+
+# Card fields that never count as a modification in compare_cards
+UNTRACKED_FIELDS = ('dateLastActivity', 'customFieldItems', 'shortUrl')
+
 
 class TrelloListMonitor:
     """
@@ -23,7 +31,8 @@ class TrelloListMonitor:
     - Retrieve detailed card information including custom fields
     """
     
-    def __init__(self, list_id: Optional[str] = None):
+    def __init__(self, list_id: Optional[str] = None, session: Optional[TrelloSession] = None,
+                 cache: Optional[TrelloMetadataCache] = None, inline_custom_fields: bool = False):
         """
         Initialize the Trello List Monitor.
         
@@ -35,6 +44,13 @@ class TrelloListMonitor:
         Args:
             list_id (Optional[str]): The ID of the Trello list to monitor.
                                    If not provided, will use TRELLO_LIST_ID from .env
+            session (Optional[TrelloSession]): Pooled HTTP transport to use.
+                                   If not provided, the process-wide shared session is used
+            cache (Optional[TrelloMetadataCache]): Cache for the board ID and custom field
+                                   definitions. If not provided, the shared cache is used
+            inline_custom_fields (bool): Fetch customFieldItems and shortUrl with every
+                                   get_cards() call so card details can be resolved from the
+                                   last poll (see get_card_details_bulk) without extra requests
         """
         # Load environment variables from .env file
         load_dotenv()
@@ -51,6 +67,12 @@ class TrelloListMonitor:
             raise ValueError("TRELLO_LIST_ID not provided and not found in environment variables")
             
         self.base_url = "https://api.trello.com/1"
+        self.session = session or get_shared_session()
+        self.cache = cache or get_shared_cache()
+        self.inline_custom_fields = inline_custom_fields
+        
+        # Cards from the most recent get_cards() call
+        self.snapshot: Dict[str, Dict] = {}
 
         # we want to get the custom field for 'Alter' and the dictionary of alters
         self.alter_custom_field_id, self.alters = self.get_alter_info()
@@ -91,45 +113,71 @@ class TrelloListMonitor:
         return random.choice(list(self.alters.keys()))
 
 
-    def get_custom_fields(self) -> Dict[str, Dict]:
+    def get_board_id(self) -> str:
         """
-        Fetch all custom fields for the board containing the monitored list.
+        Get the ID of the board containing the monitored list (cached).
         
         Returns:
-            Dict[str, Dict]: Dictionary with custom field IDs as keys and field definitions as values
+            str: The board ID
             
         Raises:
             requests.RequestException: If the API request fails
         """
-        # Get board ID from the list
-        board_url = f"{self.base_url}/lists/{self.list_id}/board"
-        params = {
-            'key': self.api_key,
-            'token': self.token,
-            'fields': 'id'
-        }
-        
-        response = requests.get(board_url, params=params)
-        response.raise_for_status()
+        def fetch() -> str:
+            board_url = f"{self.base_url}/lists/{self.list_id}/board"
+            params = {
+                'key': self.api_key,
+                'token': self.token,
+                'fields': 'id'
+            }
+            
+            response = self.session.get(board_url, params=params)
+            response.raise_for_status()
+            
+            return response.json()['id']
         
-        board_id = response.json()['id']
+        return self.cache.get_board_id(self.list_id, fetch)
+
+    def get_custom_fields(self, board_id: Optional[str] = None,
+                          required_ids: Tuple[str, ...] = ()) -> Dict[str, Dict]:
+        """
+        Get all custom field definitions for a board (cached).
         
-        # Fetch custom fields for the board
-        cf_url = f"{self.base_url}/boards/{board_id}/customFields"
-        cf_params = {
-            'key': self.api_key,
-            'token': self.token
-        }
+        Args:
+            board_id (Optional[str]): Board to get the fields of. Defaults to the board
+                                      containing the monitored list
+            required_ids (Tuple[str, ...]): Custom field IDs expected to exist; the cached
+                                      definitions are refetched if any are missing
         
-        cf_response = requests.get(cf_url, params=cf_params)
-        cf_response.raise_for_status()
+        Returns:
+            Dict[str, Dict]: Dictionary with custom field IDs as keys and field definitions as values
+            
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        board_id = board_id or self.get_board_id()
+        
+        def fetch() -> Dict[str, Dict]:
+            cf_url = f"{self.base_url}/boards/{board_id}/customFields"
+            cf_params = {
+                'key': self.api_key,
+                'token': self.token
+            }
+            
+            cf_response = self.session.get(cf_url, params=cf_params)
+            cf_response.raise_for_status()
+            
+            return {cf['id']: cf for cf in cf_response.json()}
         
-        return {cf['id']: cf for cf in cf_response.json()}
+        return self.cache.get_custom_fields(board_id, fetch, required_ids)
     
     def get_custom_field_items_for_card(self, card_id: str) -> Dict[str, Dict]:
         """
         Fetch all custom field items for a specific card.
         
+        With inline_custom_fields, cards in the last poll are resolved from it
+        without a request.
+        
         Args:
             card_id (str): The ID of the card to get custom fields for
             
@@ -139,13 +187,17 @@ class TrelloListMonitor:
         Raises:
             requests.RequestException: If the API request fails
         """
+        card = self.snapshot.get(card_id)
+        if card is not None and 'customFieldItems' in card:
+            return {item['idCustomField']: item for item in card['customFieldItems']}
+        
         url = f"{self.base_url}/cards/{card_id}/customFieldItems"
         params = {
             'key': self.api_key,
             'token': self.token
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
         
         items = response.json()
@@ -167,14 +219,79 @@ class TrelloListMonitor:
             'token': self.token,
             'fields': 'id,name,desc,due,dateLastActivity,pos,closed'
         }
+        if self.inline_custom_fields:
+            params['fields'] += ',shortUrl'
+            params['customFieldItems'] = 'true'
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
         
         cards = response.json()
-        return {card['id']: card for card in cards}
+        self.snapshot = {card['id']: card for card in cards}
+        return dict(self.snapshot)
     
-    def compare_cards(self, old_cards: Dict, new_cards: Dict) -> Dict:
+    def get_watermark(self) -> frozenset:
+        """
+        Fetch a cheap fingerprint of the list: the (id, dateLastActivity) pair of each card.
+        
+        Any card added, removed or edited in the list changes the watermark, so
+        monitor(conditional=True) can skip the full get_cards() fetch when it hasn't moved.
+        
+        Returns:
+            frozenset: Set of (card_id, dateLastActivity) pairs
+            
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        url = f"{self.base_url}/lists/{self.list_id}/cards"
+        params = {
+            'key': self.api_key,
+            'token': self.token,
+            'fields': 'id,dateLastActivity'
+        }
+        
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+        
+        return frozenset((card['id'], card['dateLastActivity']) for card in response.json())
+    
+    def get_card(self, card_id: str) -> Optional[Dict]:
+        """
+        Fetch a single card with the same fields as get_cards().
+        
+        Args:
+            card_id (str): The ID of the card to fetch
+            
+        Returns:
+            Optional[Dict]: Card data, or None if the card no longer exists or
+                            isn't an open card in the monitored list
+            
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        url = f"{self.base_url}/cards/{card_id}"
+        params = {
+            'key': self.api_key,
+            'token': self.token,
+            'fields': 'id,name,desc,due,dateLastActivity,pos,closed,idList'
+        }
+        if self.inline_custom_fields:
+            params['fields'] += ',shortUrl'
+            params['customFieldItems'] = 'true'
+        
+        response = self.session.get(url, params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        
+        card = response.json()
+        # Callers (e.g. webhook payloads) only claim the card is in our list; check it
+        if card.pop('idList', None) != self.list_id or card.get('closed'):
+            return None
+        return card
+    
+    @staticmethod
+    def compare_cards(old_cards: Dict, new_cards: Dict) -> Dict:
         """
         Compare two card states and return differences.
         
@@ -198,16 +315,16 @@ class TrelloListMonitor:
             old_card = old_cards[card_id]
             new_card = new_cards[card_id]
             
-            # Compare relevant fields (excluding dateLastActivity)
-            old_relevant = {k: v for k, v in old_card.items() if k != 'dateLastActivity'}
-            new_relevant = {k: v for k, v in new_card.items() if k != 'dateLastActivity'}
+            # Compare relevant fields (excluding dateLastActivity and inline extras)
+            old_relevant = {k: v for k, v in old_card.items() if k not in UNTRACKED_FIELDS}
+            new_relevant = {k: v for k, v in new_card.items() if k not in UNTRACKED_FIELDS}
             
             if old_relevant != new_relevant:
                 modified.append({
                     'id': card_id,
                     'old': old_card,
                     'new': new_card,
-                    'changes': self._get_field_changes(old_card, new_card)
+                    'changes': TrelloListMonitor._get_field_changes(old_card, new_card)
                 })
         
         return {
@@ -216,7 +333,8 @@ class TrelloListMonitor:
             'modified': modified
         }
     
-    def _get_field_changes(self, old_card: Dict, new_card: Dict) -> Dict:
+    @staticmethod
+    def _get_field_changes(old_card: Dict, new_card: Dict) -> Dict:
         """
         Get specific field changes between two cards.
         
@@ -236,7 +354,8 @@ class TrelloListMonitor:
                 }
         return changes
     
-    def print_diff(self, diff: Dict, verbose: bool = True):
+    @staticmethod
+    def print_diff(diff: Dict, verbose: bool = True):
         """
         Pretty print the differences between card states.
         
@@ -267,7 +386,9 @@ class TrelloListMonitor:
                     print(f"    {field}: '{change['old']}' → '{change['new']}'")
     
     def monitor(self, interval: float = 1.0, max_iterations: Optional[int] = None, 
-                callback: Optional[callable] = None, verbose: bool = True):
+                callback: Optional[callable] = None, verbose: bool = True,
+                conditional: bool = False,
+                interval_policy: Optional[IntervalPolicy] = None):
         """
         Monitor the list for changes.
         
@@ -276,57 +397,35 @@ class TrelloListMonitor:
             max_iterations (Optional[int]): Maximum number of iterations (None for infinite)
             callback (Optional[callable]): Function to call when changes are detected
             verbose (bool): Whether to print status information
+            conditional (bool): Check get_watermark() first and only fetch the full
+                                cards when it has moved
+            interval_policy (Optional[IntervalPolicy]): Decides the wait between polls
+                                (e.g. AdaptiveInterval). Defaults to a fixed interval
             
         The callback function, if provided, will be called with the diff dictionary
         whenever changes are detected.
         """
+        policy = interval_policy or FixedInterval(interval)
+        
         if verbose:
             print(f"Starting monitor for list {self.list_id}")
-            print(f"Checking every {interval} seconds...")
+            print(f"Checking every {policy}...")
             print("Press Ctrl+C to stop\n")
         
-        # Get initial state
-        try:
-            previous_cards = self.get_cards()
-            if verbose:
-                print(f"Initial state: {len(previous_cards)} cards")
-        except requests.RequestException as e:
-            print(f"Error fetching initial state: {e}")
-            return
-        
-        iteration = 0
-        try:
-            while max_iterations is None or iteration < max_iterations:
-                time.sleep(interval)
-                iteration += 1
-                
-                try:
-                    current_cards = self.get_cards()
-                    diff = self.compare_cards(previous_cards, current_cards)
-                    
-                    if verbose:
-                        print(".", end='')  # Print a dot for each iteration
-                    
-                    # Check if there are any changes
-                    has_changes = any(diff.values())
-                    
-                    if has_changes:
-                        if verbose:
-                            self.print_diff(diff)
-                        
-                        # Call callback if provided
-                        if callback:
-                            callback(diff)
-                    
-                    previous_cards = current_cards
-                    
-                except requests.RequestException as e:
-                    if verbose:
-                        print(f"Error fetching cards: {e}")
-                    
-        except KeyboardInterrupt:
-            if verbose:
-                print("\nMonitoring stopped by user")
+        def on_tick(previous_cards: List[Dict], current_cards: List[Dict]) -> bool:
+            diff = self.compare_cards(previous_cards, current_cards)
+            has_changes = any(diff.values())
+            if has_changes:
+                if verbose:
+                    self.print_diff(diff)
+                if callback:
+                    callback(diff)
+            return has_changes
+        
+        poll_loop(self.get_cards, on_tick, policy, max_iterations=max_iterations,
+                  watermark=self.get_watermark if conditional else None,
+                  on_start=lambda cards: print(f"Initial state: {len(cards)} cards"),
+                  verbose=verbose, print_stats=interval_policy is not None)
 
     def get_card_details(self, card_id: str) -> Dict:
         """
@@ -346,40 +445,107 @@ class TrelloListMonitor:
         card_params = {
             'key': self.api_key,
             'token': self.token,
-            'fields': 'id,name,desc,customFieldItems,shortUrl',
+            'fields': 'id,name,desc,customFieldItems,shortUrl,idBoard',
             'customFieldItems': 'true'
         }
         
-        card_response = requests.get(card_url, params=card_params)
+        card_response = self.session.get(card_url, params=card_params)
         card_response.raise_for_status()
         card_data = card_response.json()
         
-        # Get board ID from the card
-        card_board_url = f"{self.base_url}/cards/{card_id}/board"
-        board_params = {
-            'key': self.api_key,
-            'token': self.token,
-            'fields': 'id'
-        }
+        # Get custom field definitions (cached per board)
+        cf_def_map = self.get_custom_fields(
+            card_data['idBoard'],
+            required_ids=tuple(item['idCustomField'] for item in card_data.get('customFieldItems', []))
+        )
         
-        board_response = requests.get(card_board_url, params=board_params)
-        board_response.raise_for_status()
-        board_id = board_response.json()['id']
-        card_frontend_url = card_data.get('shortUrl', '')
+        return self.build_card_details(card_data, cf_def_map)
+
+    def get_card_details_bulk(self, card_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get card details for several cards, resolving them from the last poll where possible.
+        
+        With inline_custom_fields, cards in the last get_cards() snapshot cost no
+        requests; any others are fetched with get_card_details_many().
         
-        # Get custom field definitions
-        custom_fields_url = f"{self.base_url}/boards/{board_id}/customFields"
-        cf_params = {
+        Args:
+            card_ids (List[str]): The IDs of the cards to retrieve
+            
+        Returns:
+            Dict[str, Dict]: Card details keyed by card ID. Cards that no longer
+                             exist are left out
+            
+        Raises:
+            requests.RequestException: If an API request fails
+        """
+        details = {}
+        misses = []
+        for card_id in card_ids:
+            card = self.snapshot.get(card_id)
+            if card is not None and 'customFieldItems' in card:
+                cf_def_map = self.get_custom_fields(
+                    required_ids=tuple(item['idCustomField'] for item in card['customFieldItems'])
+                )
+                details[card_id] = self.build_card_details(card, cf_def_map)
+            else:
+                misses.append(card_id)
+        
+        if misses:
+            details.update(self.get_card_details_many(misses))
+        return details
+
+    def get_card_details_many(self, card_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get card details for several cards through /1/batch (up to 10 cards per request).
+        
+        Args:
+            card_ids (List[str]): The IDs of the cards to retrieve
+            
+        Returns:
+            Dict[str, Dict]: Card details keyed by card ID. Cards that no longer
+                             exist are left out
+            
+        Raises:
+            requests.RequestException: If a request fails
+        """
+        routes = {
+            card_id: f"/cards/{card_id}?fields=id,name,desc,customFieldItems,shortUrl,idBoard&customFieldItems=true"
+            for card_id in card_ids
+        }
+        params = {
             'key': self.api_key,
             'token': self.token
         }
+        results = self.session.batch(self.base_url, list(routes.values()), params=params)
+        
+        details = {}
+        for card_id, route in routes.items():
+            card_data = results[route]
+            if isinstance(card_data, TrelloBatchError):
+                if card_data.status_code == 404:
+                    continue
+                raise card_data
+            
+            cf_def_map = self.get_custom_fields(
+                card_data['idBoard'],
+                required_ids=tuple(item['idCustomField'] for item in card_data.get('customFieldItems', []))
+            )
+            details[card_id] = self.build_card_details(card_data, cf_def_map)
+        return details
+
+    @staticmethod
+    def build_card_details(card_data: Dict, cf_def_map: Dict[str, Dict]) -> Dict:
+        """
+        Build the card details view from a card payload that includes customFieldItems.
         
-        cf_response = requests.get(custom_fields_url, params=cf_params)
-        cf_response.raise_for_status()
-        custom_field_definitions = cf_response.json()
-        
-        # Create mapping of custom field IDs to definitions
-        cf_def_map = {cf['id']: cf for cf in custom_field_definitions}
+        Args:
+            card_data (Dict): Card payload with 'id', 'name', 'desc', 'shortUrl' and 'customFieldItems'
+            cf_def_map (Dict[str, Dict]): Custom field definitions keyed by custom field ID
+            
+        Returns:
+            Dict: Card details including title, description, and custom fields
+        """
+        card_frontend_url = card_data.get('shortUrl', '')
         
         # Process custom field values
         custom_fields = {}
@@ -520,8 +686,10 @@ class TrelloListMonitor:
             raise ValueError(f"Unsupported field type: {field_type}")
 
         try:
-            response = requests.put(url, params=params, headers=headers, data=json.dumps(body))
+            response = self.session.put(url, params=params, headers=headers, data=json.dumps(body))
             response.raise_for_status()
+            # The card's inline customFieldItems are stale now
+            self.snapshot.pop(card_id, None)
             return True
         except requests.RequestException as e:
             print(f"Error setting custom field: {e}")
@@ -549,7 +717,7 @@ class TrelloListMonitor:
         }
 
         try:
-            response = requests.delete(url, params=params)
+            response = self.session.delete(url, params=params)
             response.raise_for_status()
             return True
         except requests.RequestException as e:
@@ -0,0 +1,205 @@
+"""
+Trello Actions Library
+
+Helpers for applying Trello action payloads (as delivered by webhooks or the
+/actions feed) to a locally held card snapshot, so callers can keep using
+compare_cards() to produce the usual diff dictionaries.
+"""
+
+from typing import Callable, Dict, Optional
+
+
+# Card fields a monitor snapshot tracks and that an updateCard can change in place
+TRACKED_CARD_FIELDS = {'name', 'desc', 'due', 'pos', 'closed'}
+
+# Actions that bring a card into existence (or onto the board)
+CREATE_CARD_ACTIONS = {
+    'createCard', 'copyCard', 'moveCardToBoard', 'convertToCardFromCheckItem', 'emailCard'
+}
+
+# Actions that take a card away from the board
+REMOVE_CARD_ACTIONS = {'deleteCard', 'moveCardFromBoard'}
+
+# Action that sets a custom field (story points, alter, ...) on a card
+CUSTOM_FIELD_ACTION = 'updateCustomFieldItem'
+
+
+def card_from_action(action: Dict, lists: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Build a best-effort card dictionary from an action payload alone.
+
+    Used when the full card cannot (or should not) be fetched, e.g. when
+    replaying recorded webhooks offline.
+
+    Args:
+        action (Dict): A Trello action
+        lists (Optional[Dict[str, Dict]]): Board lists by ID. If provided, the card also
+            gets the 'idList', 'list_id' and 'list_name' fields of a board snapshot
+
+    Returns:
+        Dict: Card data shaped like TrelloListMonitor.get_cards() entries
+              (or TrelloBoardMonitor.get_cards() entries when lists is given)
+    """
+    data = action.get('data', {})
+    card = data.get('card', {})
+    result = {
+        'id': card['id'],
+        'name': card.get('name', ''),
+        'desc': card.get('desc', ''),
+        'due': card.get('due'),
+        'dateLastActivity': action.get('date'),
+        'pos': card.get('pos'),
+        'closed': card.get('closed', False)
+    }
+    if lists is not None:
+        list_id = action_list_id(action)
+        result['idList'] = list_id
+        result['list_id'] = list_id
+        result['list_name'] = lists.get(list_id, {}).get('name', 'Unknown List')
+    return result
+
+
+def action_list_id(action: Dict) -> Optional[str]:
+    """
+    Get the ID of the list a card is in after an action.
+
+    Args:
+        action (Dict): A Trello action
+
+    Returns:
+        Optional[str]: The list ID, or None if the action doesn't say
+    """
+    data = action.get('data', {})
+    for key in ('listAfter', 'list'):
+        if data.get(key, {}).get('id'):
+            return data[key]['id']
+    return data.get('card', {}).get('idList')
+
+
+def apply_card_action(cards: Dict[str, Dict], action: Dict,
+                      fetch_card: Optional[Callable[[str], Optional[Dict]]] = None,
+                      list_id: Optional[str] = None,
+                      lists: Optional[Dict[str, Dict]] = None) -> bool:
+    """
+    Apply a single Trello action to a card snapshot in place.
+
+    Args:
+        cards (Dict[str, Dict]): Card snapshot ({card_id: card}) to update
+        action (Dict): A Trello action (createCard, updateCard, deleteCard, ...)
+        fetch_card (Optional[Callable[[str], Optional[Dict]]]): Function returning the full
+            card for an ID (or None if it no longer exists). Used when a card enters the
+            snapshot, since creation payloads don't carry every tracked field.
+            If None, the card is built from the action payload.
+        list_id (Optional[str]): Restrict the snapshot to this list (None for a whole board)
+        lists (Optional[Dict[str, Dict]]): Board lists by ID, used to shape cards built
+            from the payload like board snapshot entries
+
+    Returns:
+        bool: True if the snapshot changed
+    """
+    action_type = action.get('type')
+    data = action.get('data', {})
+    card_id = data.get('card', {}).get('id')
+    if not card_id:
+        return False
+
+    def load_card() -> Optional[Dict]:
+        if fetch_card is None:
+            return card_from_action(action, lists)
+        return fetch_card(card_id)
+
+    target_list = action_list_id(action)
+    in_scope = list_id is None or target_list == list_id
+
+    if action_type in REMOVE_CARD_ACTIONS:
+        return cards.pop(card_id, None) is not None
+
+    if action_type in CREATE_CARD_ACTIONS:
+        if not in_scope:
+            return False
+        card = load_card()
+        if card is None:
+            return False
+        cards[card_id] = card
+        return True
+
+    if action_type == CUSTOM_FIELD_ACTION:
+        return _apply_custom_field_action(cards, card_id, action, fetch_card)
+
+    if action_type != 'updateCard':
+        # Comments, members, attachments, ... don't touch the tracked fields
+        return False
+
+    old_values = data.get('old', {})
+
+    if 'closed' in old_values and data['card'].get('closed'):
+        # Archived cards drop out of /lists/{id}/cards and /boards/{id}/cards
+        return cards.pop(card_id, None) is not None
+
+    if card_id not in cards:
+        # Moved into the watched list, unarchived, or a card we somehow missed
+        if not in_scope:
+            return False
+        card = load_card()
+        if card is None:
+            return False
+        cards[card_id] = card
+        return True
+
+    if 'idList' in old_values and list_id is not None and not in_scope:
+        # Moved out of the watched list
+        del cards[card_id]
+        return True
+
+    card = dict(cards[card_id])
+    for field in old_values:
+        if field in TRACKED_CARD_FIELDS:
+            card[field] = data['card'].get(field)
+    if 'idList' in old_values and 'idList' in card:
+        # Moved between lists on a watched board
+        card['idList'] = target_list
+        card['list_id'] = target_list
+        card['list_name'] = (lists or {}).get(target_list, {}).get('name', 'Unknown List')
+
+    changed = card != cards[card_id]
+    if action.get('date'):
+        card['dateLastActivity'] = action['date']
+    cards[card_id] = card
+    return changed
+
+
+def _apply_custom_field_action(cards: Dict[str, Dict], card_id: str, action: Dict,
+                               fetch_card: Optional[Callable[[str], Optional[Dict]]]) -> bool:
+    """
+    Refresh the customFieldItems of a snapshot card after an updateCustomFieldItem.
+
+    Only snapshots holding inline customFieldItems are affected. The card is
+    refetched when possible; otherwise the item is patched from the payload.
+
+    Returns:
+        bool: True if the snapshot changed
+    """
+    card = cards.get(card_id)
+    if card is None or 'customFieldItems' not in card:
+        return False
+
+    if fetch_card is not None:
+        fetched = fetch_card(card_id)
+        if fetched is None:
+            return cards.pop(card_id, None) is not None
+        cards[card_id] = fetched
+        return fetched != card
+
+    item = action.get('data', {}).get('customFieldItem', {})
+    field_id = item.get('idCustomField') or action.get('data', {}).get('customField', {}).get('id')
+    if not field_id:
+        return False
+    items = [existing for existing in card['customFieldItems'] if existing.get('idCustomField') != field_id]
+    if item.get('value') or item.get('idValue'):
+        items.append(dict(item, idCustomField=field_id))
+    card = dict(card, customFieldItems=items)
+    if action.get('date'):
+        card['dateLastActivity'] = action['date']
+    changed = card != cards[card_id]
+    cards[card_id] = card
+    return changed
@@ -12,6 +12,19 @@ import os
 from dotenv import load_dotenv
 import random
 
+from polling import FixedInterval, IntervalPolicy, poll_loop
+from trello import UNTRACKED_FIELDS, TrelloListMonitor
+from trello_actions import apply_card_action
+from trello_cache import TrelloMetadataCache, get_shared_cache
+from trello_session import TrelloBatchError, TrelloSession, get_shared_session
+
+
+# Action types that can change the cards a board snapshot tracks
+CARD_ACTION_FILTER = ','.join([
+    'createCard', 'updateCard', 'deleteCard', 'copyCard', 'moveCardToBoard',
+    'moveCardFromBoard', 'convertToCardFromCheckItem', 'emailCard', 'updateCustomFieldItem'
+])
+
 
 class TrelloBoardMonitor:
     """
@@ -24,7 +37,8 @@ class TrelloBoardMonitor:
     - Retrieve detailed card information including custom fields
     """
     
-    def __init__(self, board_id: Optional[str] = None):
+    def __init__(self, board_id: Optional[str] = None, session: Optional[TrelloSession] = None,
+                 cache: Optional[TrelloMetadataCache] = None, inline_custom_fields: bool = False):
         """
         Initialize the Trello Board Monitor.
         
@@ -36,6 +50,13 @@ class TrelloBoardMonitor:
         Args:
             board_id (Optional[str]): The ID of the Trello board to monitor.
                                      If not provided, will use TRELLO_BOARD_ID from .env
+            session (Optional[TrelloSession]): Pooled HTTP transport to use.
+                                     If not provided, the process-wide shared session is used
+            cache (Optional[TrelloMetadataCache]): Cache for custom field definitions.
+                                     If not provided, the shared cache is used
+            inline_custom_fields (bool): Fetch customFieldItems and shortUrl with every
+                                     get_cards() call so card details can be resolved from the
+                                     last poll (see get_card_details_bulk) without extra requests
         """
         # Load environment variables from .env file
         load_dotenv()
@@ -52,10 +73,21 @@ class TrelloBoardMonitor:
             raise ValueError("TRELLO_BOARD_ID not provided and not found in environment variables")
             
         self.base_url = "https://api.trello.com/1"
+        self.session = session or get_shared_session()
+        self.cache = cache or get_shared_cache()
+        self.inline_custom_fields = inline_custom_fields
+        
+        # Cards from the most recent get_cards() call (and cards fetched since)
+        self.snapshot: Dict[str, Dict] = {}
         
         # Cache board lists for reference
         self.lists = self.get_lists()
         
+        # Incremental sync state (see sync_cards)
+        self._card_index: Optional[Dict[str, Dict]] = None
+        self._last_action_id: Optional[str] = None
+        self._last_full_sync = 0.0
+        
         # Get alter info (if applicable to your board)
         try:
             self.alter_custom_field_id, self.alters = self.get_alter_info()
@@ -76,7 +108,7 @@ class TrelloBoardMonitor:
             'fields': 'id,name,pos,closed'
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
         
         lists = response.json()
@@ -109,23 +141,30 @@ class TrelloBoardMonitor:
             raise ValueError("No alters available")
         return random.choice(list(self.alters.keys()))
 
-    def get_custom_fields(self) -> Dict[str, Dict]:
+    def get_custom_fields(self, required_ids: Tuple[str, ...] = ()) -> Dict[str, Dict]:
         """
-        Fetch all custom fields for the board.
+        Get all custom field definitions for the board (cached).
+        
+        Args:
+            required_ids (Tuple[str, ...]): Custom field IDs expected to exist; the cached
+                                            definitions are refetched if any are missing
         
         Returns:
             Dict[str, Dict]: Dictionary with custom field IDs as keys and field definitions as values
         """
-        cf_url = f"{self.base_url}/boards/{self.board_id}/customFields"
-        cf_params = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        
-        cf_response = requests.get(cf_url, params=cf_params)
-        cf_response.raise_for_status()
+        def fetch() -> Dict[str, Dict]:
+            cf_url = f"{self.base_url}/boards/{self.board_id}/customFields"
+            cf_params = {
+                'key': self.api_key,
+                'token': self.token
+            }
+            
+            cf_response = self.session.get(cf_url, params=cf_params)
+            cf_response.raise_for_status()
+            
+            return {cf['id']: cf for cf in cf_response.json()}
         
-        return {cf['id']: cf for cf in cf_response.json()}
+        return self.cache.get_custom_fields(self.board_id, fetch, required_ids)
 
     def get_cards(self) -> Dict[str, Dict]:
         """
@@ -141,8 +180,11 @@ class TrelloBoardMonitor:
             'token': self.token,
             'fields': 'id,name,desc,due,dateLastActivity,pos,closed,idList'
         }
+        if self.inline_custom_fields:
+            params['fields'] += ',shortUrl'
+            params['customFieldItems'] = 'true'
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
         
         cards = response.json()
@@ -157,10 +199,137 @@ class TrelloBoardMonitor:
             card['list_id'] = list_id
             card['list_name'] = list_name
             enhanced_cards[card_id] = card
-            
+        
+        self.snapshot = dict(enhanced_cards)
         return enhanced_cards
 
-    def compare_cards(self, old_cards: Dict, new_cards: Dict) -> Dict:
+    def get_card(self, card_id: str) -> Optional[Dict]:
+        """
+        Fetch a single card with the same fields as get_cards().
+        
+        Args:
+            card_id (str): The ID of the card to fetch
+            
+        Returns:
+            Optional[Dict]: Card data including 'list_id' and 'list_name',
+                            or None if the card no longer exists
+        """
+        url = f"{self.base_url}/cards/{card_id}"
+        params = {
+            'key': self.api_key,
+            'token': self.token,
+            'fields': 'id,name,desc,due,dateLastActivity,pos,closed,idList'
+        }
+        if self.inline_custom_fields:
+            params['fields'] += ',shortUrl'
+            params['customFieldItems'] = 'true'
+        
+        response = self.session.get(url, params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        
+        card = response.json()
+        card['list_id'] = card['idList']
+        card['list_name'] = self.lists.get(card['idList'], {}).get('name', 'Unknown List')
+        self.snapshot[card_id] = card
+        return card
+
+    def get_watermark(self) -> Optional[str]:
+        """
+        Fetch the board's dateLastActivity, a cheap fingerprint of any change on the board.
+        
+        monitor(conditional=True) skips the full card fetch while it hasn't moved.
+        
+        Returns:
+            Optional[str]: The board's dateLastActivity timestamp
+        """
+        url = f"{self.base_url}/boards/{self.board_id}"
+        params = {
+            'key': self.api_key,
+            'token': self.token,
+            'fields': 'dateLastActivity'
+        }
+        
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+        
+        return response.json().get('dateLastActivity')
+
+    def get_actions(self, since: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """
+        Fetch card actions on the board, newest first.
+        
+        Args:
+            since (Optional[str]): Only return actions after this action ID (or date)
+            limit (int): Maximum number of actions to return (Trello caps this at 1000)
+            
+        Returns:
+            List[Dict]: Actions with 'id', 'type', 'date' and 'data'
+        """
+        url = f"{self.base_url}/boards/{self.board_id}/actions"
+        params = {
+            'key': self.api_key,
+            'token': self.token,
+            'filter': CARD_ACTION_FILTER,
+            'fields': 'id,type,date,data',
+            'limit': limit
+        }
+        if since:
+            params['since'] = since
+        
+        response = self.session.get(url, params=params)
+        response.raise_for_status()
+        
+        return response.json()
+
+    def sync_cards(self, resync_interval: float = 300.0, actions_limit: int = 1000) -> Dict[str, Dict]:
+        """
+        Get the current board cards by applying new actions to a local card index.
+        
+        Only /boards/{id}/actions?since=<last action id> is fetched on most calls. A full
+        get_cards() resync happens on the first call, every resync_interval seconds, and
+        whenever a page of actions comes back full (we may have missed some).
+        
+        Args:
+            resync_interval (float): Seconds between full resyncs
+            actions_limit (int): Page size for the actions feed; a full page triggers a resync
+            
+        Returns:
+            Dict[str, Dict]: Same shape as get_cards()
+        """
+        if (self._card_index is None or self._last_action_id is None
+                or time.time() - self._last_full_sync >= resync_interval):
+            return self._full_sync()
+        
+        actions = self.get_actions(since=self._last_action_id, limit=actions_limit)
+        if len(actions) >= actions_limit:
+            print(f"\n⚠️  {len(actions)} actions since last sync, resyncing board")
+            return self._full_sync()
+        
+        # Work on a copy so a failed card fetch leaves the index and cursor untouched
+        cards = dict(self._card_index)
+        for action in reversed(actions):
+            apply_card_action(cards, action, self.get_card, lists=self.lists)
+        
+        if actions:
+            self._last_action_id = actions[0]['id']
+        self._card_index = cards
+        return cards
+
+    def _full_sync(self) -> Dict[str, Dict]:
+        """Rebuild the incremental card index from a full get_cards() fetch."""
+        # Take the cursor first so actions racing with the fetch are replayed next time
+        latest = self.get_actions(limit=1)
+        cards = self.get_cards()
+        
+        self._last_action_id = latest[0]['id'] if latest else None
+        self._card_index = cards
+        self._last_full_sync = time.time()
+        return dict(cards)
+
+    @staticmethod
+    def compare_cards(old_cards: Dict, new_cards: Dict) -> Dict:
         """
         Compare two card states and return differences, including list movements.
         
@@ -197,18 +366,18 @@ class TrelloBoardMonitor:
                     'new_card': new_card
                 })
             
-            # Compare relevant fields (excluding dateLastActivity and list changes)
+            # Compare relevant fields (excluding dateLastActivity, inline extras and list changes)
             old_relevant = {k: v for k, v in old_card.items() 
-                           if k not in ['dateLastActivity', 'idList', 'list_id', 'list_name']}
+                           if k not in UNTRACKED_FIELDS + ('idList', 'list_id', 'list_name')}
             new_relevant = {k: v for k, v in new_card.items() 
-                           if k not in ['dateLastActivity', 'idList', 'list_id', 'list_name']}
+                           if k not in UNTRACKED_FIELDS + ('idList', 'list_id', 'list_name')}
             
             if old_relevant != new_relevant:
                 modified.append({
                     'id': card_id,
                     'old': old_card,
                     'new': new_card,
-                    'changes': self._get_field_changes(old_card, new_card)
+                    'changes': TrelloBoardMonitor._get_field_changes(old_card, new_card)
                 })
         
         return {
@@ -218,7 +387,8 @@ class TrelloBoardMonitor:
             'moved': moved
         }
 
-    def _get_field_changes(self, old_card: Dict, new_card: Dict) -> Dict:
+    @staticmethod
+    def _get_field_changes(old_card: Dict, new_card: Dict) -> Dict:
         """Get specific field changes between two cards."""
         changes = {}
         for field in ['name', 'desc', 'due', 'pos', 'closed']:
@@ -229,7 +399,8 @@ class TrelloBoardMonitor:
                 }
         return changes
 
-    def print_diff(self, diff: Dict, verbose: bool = True):
+    @staticmethod
+    def print_diff(diff: Dict, verbose: bool = True):
         """
         Pretty print the differences between card states, including list movements.
         
@@ -265,7 +436,10 @@ class TrelloBoardMonitor:
                     print(f"    {field}: '{change['old']}' → '{change['new']}'")
 
     def monitor(self, interval: float = 1.0, max_iterations: Optional[int] = None, 
-                callback: Optional[callable] = None, verbose: bool = True):
+                callback: Optional[callable] = None, verbose: bool = True,
+                incremental: bool = False, resync_interval: float = 300.0,
+                conditional: bool = False,
+                interval_policy: Optional[IntervalPolicy] = None):
         """
         Monitor the entire board for changes.
         
@@ -274,55 +448,41 @@ class TrelloBoardMonitor:
             max_iterations (Optional[int]): Maximum number of iterations (None for infinite)
             callback (Optional[callable]): Function to call when changes are detected
             verbose (bool): Whether to print status information
+            incremental (bool): Use sync_cards() (actions feed) instead of a full get_cards() each tick
+            resync_interval (float): Seconds between full resyncs in incremental mode
+            conditional (bool): Check get_watermark() first and only fetch cards when it has moved
+            interval_policy (Optional[IntervalPolicy]): Decides the wait between polls
+                                (e.g. AdaptiveInterval). Defaults to a fixed interval
         """
+        if incremental:
+            fetch_cards = lambda: self.sync_cards(resync_interval=resync_interval)
+        else:
+            fetch_cards = self.get_cards
+        
+        policy = interval_policy or FixedInterval(interval)
+        
         if verbose:
             print(f"Starting board monitor for board {self.board_id}")
             print(f"Monitoring {len(self.lists)} lists")
-            print(f"Checking every {interval} seconds...")
+            print(f"Checking every {policy}...")
+            if incremental:
+                print(f"Incremental sync via actions feed (full resync every {resync_interval} seconds)")
             print("Press Ctrl+C to stop\n")
         
-        # Get initial state
-        try:
-            previous_cards = self.get_cards()
-            if verbose:
-                print(f"Initial state: {len(previous_cards)} cards across {len(self.lists)} lists")
-        except requests.RequestException as e:
-            print(f"Error fetching initial state: {e}")
-            return
-        
-        iteration = 0
-        try:
-            while max_iterations is None or iteration < max_iterations:
-                time.sleep(interval)
-                iteration += 1
-                
-                try:
-                    current_cards = self.get_cards()
-                    diff = self.compare_cards(previous_cards, current_cards)
-                    
-                    if verbose:
-                        print(".", end='')  # Print a dot for each iteration
-                    
-                    # Check if there are any changes
-                    has_changes = any(diff.values())
-                    
-                    if has_changes:
-                        if verbose:
-                            self.print_diff(diff)
-                        
-                        # Call callback if provided
-                        if callback:
-                            callback(diff)
-                    
-                    previous_cards = current_cards
-                    
-                except requests.RequestException as e:
-                    if verbose:
-                        print(f"Error fetching cards: {e}")
-                    
-        except KeyboardInterrupt:
-            if verbose:
-                print("\nMonitoring stopped by user")
+        def on_tick(previous_cards: List[Dict], current_cards: List[Dict]) -> bool:
+            diff = self.compare_cards(previous_cards, current_cards)
+            has_changes = any(diff.values())
+            if has_changes:
+                if verbose:
+                    self.print_diff(diff)
+                if callback:
+                    callback(diff)
+            return has_changes
+        
+        poll_loop(fetch_cards, on_tick, policy, max_iterations=max_iterations,
+                  watermark=self.get_watermark if conditional else None,
+                  on_start=lambda cards: print(f"Initial state: {len(cards)} cards across {len(self.lists)} lists"),
+                  verbose=verbose, print_stats=interval_policy is not None)
 
     def get_card_details(self, card_id: str) -> Dict:
         """
@@ -338,92 +498,104 @@ class TrelloBoardMonitor:
             'customFieldItems': 'true'
         }
         
-        card_response = requests.get(card_url, params=card_params)
+        card_response = self.session.get(card_url, params=card_params)
         card_response.raise_for_status()
         card_data = card_response.json()
         
-        card_frontend_url = card_data.get('shortUrl', '')
+        # Get custom field definitions (cached, we already have the board_id)
+        cf_def_map = self.get_custom_fields(
+            required_ids=tuple(item['idCustomField'] for item in card_data.get('customFieldItems', []))
+        )
         
-        # Get custom field definitions (we already have the board_id)
-        custom_fields_url = f"{self.base_url}/boards/{self.board_id}/customFields"
-        cf_params = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        
-        cf_response = requests.get(custom_fields_url, params=cf_params)
-        cf_response.raise_for_status()
-        custom_field_definitions = cf_response.json()
+        return self.build_card_details(card_data, cf_def_map)
+
+    def get_card_details_bulk(self, card_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get card details for several cards, resolving them from the last poll where possible.
         
-        # Create mapping of custom field IDs to definitions
-        cf_def_map = {cf['id']: cf for cf in custom_field_definitions}
+        With inline_custom_fields, cards in the last get_cards() snapshot cost no
+        requests; any others are fetched with get_card_details_many().
         
-        # Process custom field values (same logic as original)
-        custom_fields = {}
-        for cf_item in card_data.get('customFieldItems', []):
-            cf_id = cf_item['idCustomField']
-            cf_def = cf_def_map.get(cf_id)
+        Args:
+            card_ids (List[str]): The IDs of the cards to retrieve
             
-            if cf_def:
-                field_name = cf_def['name']
-                field_type = cf_def['type']
-                
-                value = None
-                if 'value' in cf_item:
-                    if field_type == 'text':
-                        value = cf_item['value'].get('text')
-                    elif field_type == 'number':
-                        value = cf_item['value'].get('number')
-                    elif field_type == 'date':
-                        value = cf_item['value'].get('date')
-                    elif field_type == 'checkbox':
-                        value = cf_item['value'].get('checked')
-                    elif field_type == 'list':
-                        value = cf_item['value']
-                
-                custom_fields[field_name] = {
-                    'value': value,
-                    'type': field_type,
-                    'id': cf_id
-                }
+        Returns:
+            Dict[str, Dict]: Card details keyed by card ID. Cards that no longer
+                             exist are left out
+        """
+        details = {}
+        misses = []
+        for card_id in card_ids:
+            card = self.snapshot.get(card_id)
+            if card is not None and 'customFieldItems' in card:
+                cf_def_map = self.get_custom_fields(
+                    required_ids=tuple(item['idCustomField'] for item in card['customFieldItems'])
+                )
+                details[card_id] = self.build_card_details(card, cf_def_map)
+            else:
+                misses.append(card_id)
+        
+        if misses:
+            details.update(self.get_card_details_many(misses))
+        return details
 
-        # Extract common fields
-        story_points = 0.1
-        if 'Story Points' in custom_fields:
-            sp_value = custom_fields['Story Points']['value']
-            if sp_value is not None:
-                try:
-                    story_points = float(sp_value)
-                except (ValueError, TypeError):
-                    story_points = 0.1
-
-        alter = None
-        alter_custom_field_id = None
-        if 'Alter' in custom_fields:
-            alter_value = custom_fields['Alter']['value']
-            if alter_value is not None:
-                try:
-                    alter = float(alter_value)
-                except (ValueError, TypeError):
-                    alter = None
-            alter_custom_field_id = custom_fields['Alter']['id']
+    def get_card_details_many(self, card_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get card details for several cards through /1/batch (up to 10 cards per request).
+        
+        Args:
+            card_ids (List[str]): The IDs of the cards to retrieve
+            
+        Returns:
+            Dict[str, Dict]: Card details keyed by card ID. Cards that no longer
+                             exist are left out
+            
+        Raises:
+            requests.RequestException: If a request fails
+        """
+        routes = {
+            card_id: f"/cards/{card_id}?fields=id,name,desc,customFieldItems,shortUrl,idList&customFieldItems=true"
+            for card_id in card_ids
+        }
+        params = {
+            'key': self.api_key,
+            'token': self.token
+        }
+        results = self.session.batch(self.base_url, list(routes.values()), params=params)
+        
+        details = {}
+        for card_id, route in routes.items():
+            card_data = results[route]
+            if isinstance(card_data, TrelloBatchError):
+                if card_data.status_code == 404:
+                    continue
+                raise card_data
+            
+            cf_def_map = self.get_custom_fields(
+                required_ids=tuple(item['idCustomField'] for item in card_data.get('customFieldItems', []))
+            )
+            details[card_id] = self.build_card_details(card_data, cf_def_map)
+        return details
 
+    def build_card_details(self, card_data: Dict, cf_def_map: Dict[str, Dict]) -> Dict:
+        """
+        Parse card data into the get_card_details() dictionary, adding list information.
+        
+        Args:
+            card_data (Dict): Card with 'customFieldItems' and 'idList'
+            cf_def_map (Dict[str, Dict]): Custom field definitions keyed by ID
+            
+        Returns:
+            Dict: Card details (see TrelloListMonitor.build_card_details) plus
+                  'list_id' and 'list_name'
+        """
+        details = TrelloListMonitor.build_card_details(card_data, cf_def_map)
+        
         # Add list information
         list_id = card_data.get('idList')
-        list_name = self.lists.get(list_id, {}).get('name', 'Unknown List')
-
-        return {
-            'id': card_data['id'],
-            'title': card_data['name'],
-            'description': card_data.get('desc', ''),
-            'custom_fields': custom_fields,
-            'story_points': story_points,
-            'alter': alter,
-            'alter_custom_field_id': alter_custom_field_id,
-            'frontend_url': card_frontend_url,
-            'list_id': list_id,
-            'list_name': list_name
-        }
+        details['list_id'] = list_id
+        details['list_name'] = self.lists.get(list_id, {}).get('name', 'Unknown List')
+        return details
 
     def get_cards_by_list(self) -> Dict[str, List[Dict]]:
         """
@@ -476,8 +648,10 @@ class TrelloBoardMonitor:
             raise ValueError(f"Unsupported field type: {field_type}")
 
         try:
-            response = requests.put(url, params=params, headers=headers, data=json.dumps(body))
+            response = self.session.put(url, params=params, headers=headers, data=json.dumps(body))
             response.raise_for_status()
+            # The card's inline customFieldItems are stale now
+            self.snapshot.pop(card_id, None)
             return True
         except requests.RequestException as e:
             print(f"Error setting custom field: {e}")
@@ -495,7 +669,7 @@ class TrelloBoardMonitor:
         }
 
         try:
-            response = requests.delete(url, params=params)
+            response = self.session.delete(url, params=params)
             response.raise_for_status()
             return True
         except requests.RequestException as e:
@@ -0,0 +1,120 @@
+"""
+Trello Metadata Cache
+
+A small TTL cache for Trello metadata that almost never changes (the board a
+list lives on and a board's custom field definitions), shared by
+TrelloListMonitor and TrelloBoardMonitor so card lookups don't refetch it.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class TrelloMetadataCache:
+    """
+    A thread-safe TTL cache of list -> board IDs and board -> custom field definitions.
+
+    Usage:
+        cache = get_shared_cache()
+        cf_def_map = cache.get_custom_fields(board_id, lambda: fetch_definitions(board_id))
+
+        # After editing custom fields on the board
+        cache.invalidate(board_id=board_id)
+    """
+
+    def __init__(self, ttl: float = 3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds before a cached entry is refetched
+        """
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: Hashable, fetch: Callable[[], Any], refresh: bool = False) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not refresh and entry[1] > now:
+                return entry[0]
+
+        # Fetch outside the lock so a slow request doesn't block other lookups
+        value = fetch()
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def get_board_id(self, list_id: str, fetch: Callable[[], str]) -> str:
+        """
+        Get the ID of the board containing a list.
+
+        Args:
+            list_id (str): The list ID
+            fetch (Callable[[], str]): Fetches the board ID on a cache miss
+
+        Returns:
+            str: The board ID
+        """
+        return self._get(('board_id', list_id), fetch)
+
+    def get_custom_fields(self, board_id: str, fetch: Callable[[], Dict[str, Dict]],
+                          required_ids: Iterable[str] = ()) -> Dict[str, Dict]:
+        """
+        Get a board's custom field definitions keyed by custom field ID (cf_def_map).
+
+        If any of required_ids is missing from a cached map (a field was added since
+        it was cached), the map is refetched once.
+
+        Args:
+            board_id (str): The board ID
+            fetch (Callable[[], Dict[str, Dict]]): Fetches the definitions on a cache miss
+            required_ids (Iterable[str]): Custom field IDs the caller expects to find
+
+        Returns:
+            Dict[str, Dict]: Custom field definitions keyed by ID
+        """
+        key = ('custom_fields', board_id)
+        cf_def_map = self._get(key, fetch)
+        if any(cf_id not in cf_def_map for cf_id in required_ids):
+            cf_def_map = self._get(key, fetch, refresh=True)
+        return cf_def_map
+
+    def invalidate(self, board_id: Optional[str] = None, list_id: Optional[str] = None):
+        """
+        Drop cached entries.
+
+        Args:
+            board_id (Optional[str]): Drop this board's custom field definitions
+            list_id (Optional[str]): Drop this list's board ID
+            If neither is given, the whole cache is cleared.
+        """
+        with self._lock:
+            if board_id is None and list_id is None:
+                self._entries.clear()
+                return
+            if board_id is not None:
+                self._entries.pop(('custom_fields', board_id), None)
+            if list_id is not None:
+                self._entries.pop(('board_id', list_id), None)
+
+
+# Process-wide cache shared by every monitor that isn't given its own
+_shared_cache: Optional[TrelloMetadataCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> TrelloMetadataCache:
+    """
+    Get the process-wide metadata cache, creating it on first use.
+
+    Returns:
+        TrelloMetadataCache: The shared cache
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TrelloMetadataCache()
+        return _shared_cache
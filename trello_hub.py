@@ -0,0 +1,179 @@
+"""
+Trello Poll Hub - One board request per tick for every list and board watcher
+
+Instead of each notebook running its own TrelloListMonitor/TrelloBoardMonitor
+against /lists/{id}/cards or /boards/{id}/cards, the hub fetches
+/boards/{id}/cards once per tick and fans the result out to any number of
+registered list and board subscribers.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from polling import FixedInterval, IntervalPolicy, poll_loop
+from trello import TrelloListMonitor
+from trello_board import TrelloBoardMonitor
+from trello_session import TrelloSession
+
+
+# Fields added by TrelloBoardMonitor.get_cards that a list monitor never sees
+BOARD_ONLY_FIELDS = ('idList', 'list_id', 'list_name')
+
+
+class TrelloPollHub:
+    """
+    A single multiplexed poller serving every list and board watcher on a board.
+
+    List subscribers receive the same {'added', 'removed', 'modified'} diff that
+    TrelloListMonitor.compare_cards produces for their list. Board subscribers
+    receive the {'added', 'removed', 'modified', 'moved'} diff that
+    TrelloBoardMonitor.compare_cards produces for the whole board.
+
+    Usage:
+        hub = TrelloPollHub(board_id="your_board_id")
+        hub.subscribe(done_list_id, handle_done_changes)
+        hub.subscribe(queue_list_id, handle_queue_changes)
+        hub.subscribe_board(handle_board_changes)
+        hub.monitor(interval=1)
+    """
+
+    def __init__(self, board_id: Optional[str] = None, session: Optional[TrelloSession] = None):
+        """
+        Initialize the poll hub.
+
+        Args:
+            board_id (Optional[str]): The ID of the board containing the watched lists.
+                                     If not provided, will use TRELLO_BOARD_ID from .env
+            session (Optional[TrelloSession]): Pooled HTTP transport to use.
+                                     If not provided, the process-wide shared session is used
+        """
+        self.board = TrelloBoardMonitor(board_id, session=session)
+        self.list_subscribers: Dict[str, List[Callable[[Dict], None]]] = {}
+        self.board_subscribers: List[Callable[[Dict], None]] = []
+
+    def subscribe(self, list_id: str, callback: Callable[[Dict], None]):
+        """
+        Register a callback for changes in a single list.
+
+        Args:
+            list_id (str): The ID of the list to watch (must be on the hub's board)
+            callback (Callable[[Dict], None]): Called with the list diff when it changes
+        """
+        if list_id not in self.board.lists:
+            print(f"⚠️  List {list_id} is not on board {self.board.board_id}; refreshing lists")
+            self.board.lists = self.board.get_lists()
+            if list_id not in self.board.lists:
+                raise ValueError(f"List {list_id} not found on board {self.board.board_id}")
+        self.list_subscribers.setdefault(list_id, []).append(callback)
+
+    def subscribe_board(self, callback: Callable[[Dict], None]):
+        """
+        Register a callback for changes anywhere on the board.
+
+        Args:
+            callback (Callable[[Dict], None]): Called with the board diff when it changes
+        """
+        self.board_subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        """Remove a callback from every list and board subscription."""
+        for callbacks in self.list_subscribers.values():
+            while callback in callbacks:
+                callbacks.remove(callback)
+        while callback in self.board_subscribers:
+            self.board_subscribers.remove(callback)
+
+    def split_by_list(self, board_cards: Dict[str, Dict]) -> Dict[str, Dict[str, Dict]]:
+        """
+        Partition a board snapshot into per-list snapshots for the subscribed lists.
+
+        Cards are stripped of the board-only fields so they match what
+        TrelloListMonitor.get_cards returns.
+
+        Args:
+            board_cards (Dict[str, Dict]): Cards returned by TrelloBoardMonitor.get_cards()
+
+        Returns:
+            Dict[str, Dict[str, Dict]]: List IDs mapped to {card_id: card} dictionaries
+        """
+        by_list = {list_id: {} for list_id in self.list_subscribers}
+        for card_id, card in board_cards.items():
+            list_id = card.get('idList')
+            if list_id in by_list:
+                by_list[list_id][card_id] = {k: v for k, v in card.items()
+                                             if k not in BOARD_ONLY_FIELDS}
+        return by_list
+
+    def dispatch(self, previous_cards: Dict[str, Dict], current_cards: Dict[str, Dict],
+                 verbose: bool = True) -> bool:
+        """
+        Diff two board snapshots and notify every subscriber whose view changed.
+
+        Args:
+            previous_cards (Dict[str, Dict]): Previous board snapshot
+            current_cards (Dict[str, Dict]): Current board snapshot
+            verbose (bool): Whether to print the diffs
+
+        Returns:
+            bool: True if anything changed on the board
+        """
+        board_diff = self.board.compare_cards(previous_cards, current_cards)
+        if not any(board_diff.values()):
+            return False
+
+        if self.board_subscribers:
+            if verbose:
+                self.board.print_diff(board_diff)
+            for callback in self.board_subscribers:
+                self._call(callback, board_diff, verbose)
+
+        old_by_list = self.split_by_list(previous_cards)
+        new_by_list = self.split_by_list(current_cards)
+        for list_id, callbacks in self.list_subscribers.items():
+            list_diff = TrelloListMonitor.compare_cards(old_by_list[list_id], new_by_list[list_id])
+            if not any(list_diff.values()):
+                continue
+            if verbose:
+                print(f"\n📋 List '{self.board.lists.get(list_id, {}).get('name', list_id)}':")
+                TrelloListMonitor.print_diff(list_diff)
+            for callback in callbacks:
+                self._call(callback, list_diff, verbose)
+
+        return True
+
+    def _call(self, callback: Callable[[Dict], None], diff: Dict, verbose: bool):
+        """Invoke a subscriber without letting its failure starve the others."""
+        try:
+            callback(diff)
+        except Exception as e:
+            if verbose:
+                print(f"⚠️  Subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def monitor(self, interval: float = 1.0, max_iterations: Optional[int] = None,
+                verbose: bool = True, conditional: bool = False,
+                interval_policy: Optional[IntervalPolicy] = None):
+        """
+        Poll the board and fan out diffs to all subscribers.
+
+        Args:
+            interval (float): Time between checks in seconds
+            max_iterations (Optional[int]): Maximum number of iterations (None for infinite)
+            verbose (bool): Whether to print status information
+            conditional (bool): Check the board watermark first and only fetch cards when it has moved
+            interval_policy (Optional[IntervalPolicy]): Decides the wait between polls
+                                (e.g. AdaptiveInterval). Defaults to a fixed interval
+        """
+        policy = interval_policy or FixedInterval(interval)
+
+        if verbose:
+            print(f"Starting poll hub for board {self.board.board_id}")
+            print(f"Serving {len(self.list_subscribers)} list subscriptions "
+                  f"and {len(self.board_subscribers)} board subscribers")
+            print(f"Checking every {policy}...")
+            print("Press Ctrl+C to stop\n")
+
+        poll_loop(self.board.get_cards,
+                  lambda previous_cards, current_cards: self.dispatch(previous_cards, current_cards, verbose=verbose),
+                  policy, max_iterations=max_iterations,
+                  watermark=self.board.get_watermark if conditional else None,
+                  on_start=lambda cards: print(f"Initial state: {len(cards)} cards"),
+                  verbose=verbose, print_stats=interval_policy is not None)
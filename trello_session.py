@@ -0,0 +1,352 @@
+"""
+Trello Session Library
+
+A shared, pooled HTTP transport for the Trello API so that every monitor in a
+process reuses the same keep-alive connections instead of paying a fresh
+TCP+TLS handshake on each poll. All requests pass through a token-bucket
+governor that follows Trello's rate-limit headers and keeps headroom for
+monitor polls when bulk work runs alongside them.
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RateLimitGovernor:
+    """
+    A token bucket shared by all Trello requests in a process.
+
+    Trello allows 100 requests per 10 seconds per token. Each request takes a
+    token from the bucket; lower-priority requests must leave a reserve in the
+    bucket, so monitor polls keep flowing while bulk jobs (video/audio uploads,
+    card scans) wait. The bucket is corrected from the x-rate-limit-* response
+    headers and paused after a 429.
+
+    Priorities (highest first): 'poll', 'default', 'bulk'.
+    """
+
+    # Fraction of the bucket each priority must leave untouched
+    RESERVES = {'poll': 0.0, 'default': 0.1, 'bulk': 0.3}
+
+    def __init__(self, capacity: int = 100, interval: float = 10.0):
+        """
+        Initialize the governor.
+
+        Args:
+            capacity (int): Requests allowed per interval (updated from response headers)
+            interval (float): Length of the rate-limit window in seconds
+        """
+        self.capacity = capacity
+        self.interval = interval
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / self.interval)
+        self._updated = now
+
+    def acquire(self, priority: str = 'default'):
+        """
+        Block until a request of the given priority may be sent, then take a token.
+
+        Args:
+            priority (str): 'poll', 'default' or 'bulk'
+        """
+        if priority not in self.RESERVES:
+            raise ValueError(f"Unknown priority '{priority}'. Must be one of: {list(self.RESERVES)}")
+        reserve = self.RESERVES[priority] * self.capacity
+
+        with self._condition:
+            while True:
+                self._refill()
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens - 1 >= reserve:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (reserve + 1 - self.tokens) * self.interval / self.capacity
+                self._condition.wait(timeout=wait)
+
+    def update_from_headers(self, headers: Dict[str, str]):
+        """
+        Correct the bucket from Trello's x-rate-limit-api-token-* response headers.
+
+        Args:
+            headers (Dict[str, str]): Response headers
+        """
+        remaining = headers.get('x-rate-limit-api-token-remaining')
+        if remaining is None:
+            return
+
+        with self._condition:
+            limit = headers.get('x-rate-limit-api-token-max')
+            interval_ms = headers.get('x-rate-limit-api-token-interval-ms')
+            if limit:
+                self.capacity = int(limit)
+            if interval_ms:
+                self.interval = int(interval_ms) / 1000
+            self._refill()
+            # The server's count is authoritative (other processes share the token)
+            self.tokens = min(self.tokens, float(remaining))
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """
+        Stop all requests for a while, e.g. after a 429.
+
+        Args:
+            seconds (float): How long to pause
+        """
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self._condition.notify_all()
+
+
+class TrelloBatchError(requests.RequestException):
+    """A single route of a /1/batch request failed."""
+
+    def __init__(self, route: str, status_code: int, message: str = ''):
+        super().__init__(f"{status_code} for batch route {route}: {message}")
+        self.route = route
+        self.status_code = status_code
+
+
+# Process-wide governor shared by every session that isn't given its own
+_shared_governor: Optional[RateLimitGovernor] = None
+_shared_governor_lock = threading.Lock()
+
+
+def get_shared_governor() -> RateLimitGovernor:
+    """
+    Get the process-wide rate-limit governor, creating it on first use.
+
+    Returns:
+        RateLimitGovernor: The shared governor
+    """
+    global _shared_governor
+    with _shared_governor_lock:
+        if _shared_governor is None:
+            _shared_governor = RateLimitGovernor()
+        return _shared_governor
+
+
+class TrelloSession:
+    """
+    A pooled, keep-alive HTTP transport for talking to api.trello.com.
+
+    This class provides functionality to:
+    - Keep connections to Trello open between polls (keep-alive)
+    - Bound the number of pooled connections per host
+    - Request gzip-compressed responses
+    - Pace requests through a shared RateLimitGovernor and retry on 429
+    - Group GET requests into Trello's /1/batch endpoint
+
+    Usage:
+        # Share one transport between several monitors
+        session = TrelloSession(pool_size=10)
+        done_monitor = TrelloListMonitor(session=session)
+        board_monitor = TrelloBoardMonitor(session=session)
+
+        # Or use the process-wide shared transport (the default)
+        session = get_shared_session()
+
+        # Bulk jobs share the connections and rate limit, but yield to monitor polls
+        bulk_session = get_shared_session().with_priority('bulk')
+    """
+
+    # Maximum number of routes Trello accepts in one /1/batch request
+    BATCH_LIMIT = 10
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 1,
+                 timeout: Optional[float] = 30.0, governor: Optional[RateLimitGovernor] = None,
+                 priority: str = 'poll', max_rate_limit_retries: int = 3):
+        """
+        Initialize the Trello session.
+
+        Args:
+            pool_size (int): Maximum number of pooled connections kept open per host
+            max_retries (int): Number of retries on connection errors (e.g. a stale
+                               keep-alive connection closed by the server)
+            timeout (Optional[float]): Default request timeout in seconds (None for no timeout)
+            governor (Optional[RateLimitGovernor]): Rate-limit governor to pace requests with.
+                                                    If not provided, the shared governor is used
+            priority (str): Default priority for requests ('poll', 'default' or 'bulk')
+            max_rate_limit_retries (int): Times a request is retried after a 429
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.governor = governor or get_shared_governor()
+        self.priority = priority
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=max_retries
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+    def with_priority(self, priority: str) -> 'TrelloSession':
+        """
+        Get a view of this session that sends requests at another priority.
+
+        The view shares the connection pool and governor with this session.
+
+        Args:
+            priority (str): 'poll', 'default' or 'bulk'
+
+        Returns:
+            TrelloSession: The session view
+        """
+        if priority not in RateLimitGovernor.RESERVES:
+            raise ValueError(f"Unknown priority '{priority}'. Must be one of: {list(RateLimitGovernor.RESERVES)}")
+        view = copy.copy(self)
+        view.priority = priority
+        return view
+
+    def request(self, method: str, url: str, priority: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session, paced by the rate-limit governor.
+
+        A 429 response pauses the governor (using Retry-After if present, otherwise
+        exponential backoff) and the request is retried up to max_rate_limit_retries
+        times. File uploads are not retried since their streams can't be replayed.
+
+        Args:
+            method (str): HTTP method ('GET', 'PUT', 'POST', 'DELETE')
+            url (str): Full request URL
+            priority (Optional[str]): Override the session's priority for this request
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            requests.Response: The response object (possibly still a 429 if retries ran out)
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        retries = 0 if 'files' in kwargs else self.max_rate_limit_retries
+
+        for attempt in range(retries + 1):
+            self.governor.acquire(priority or self.priority)
+            response = self.session.request(method, url, **kwargs)
+            self.governor.update_from_headers(response.headers)
+
+            if response.status_code != 429:
+                return response
+
+            retry_after = response.headers.get('Retry-After')
+            try:
+                wait = float(retry_after)
+            except (TypeError, ValueError):
+                wait = 2.0 ** attempt
+            self.governor.pause(wait)
+
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request through the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        """Send a PUT request through the pooled session."""
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        """Send a DELETE request through the pooled session."""
+        return self.request('DELETE', url, **kwargs)
+
+    def batch(self, base_url: str, routes: List[str], params: Optional[Dict] = None,
+              priority: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send GET routes through Trello's /1/batch endpoint, BATCH_LIMIT routes per request.
+
+        Each batch request takes a single governor token however many routes it carries.
+
+        Args:
+            base_url (str): The API base URL (e.g. "https://api.trello.com/1")
+            routes (List[str]): Routes relative to the API version,
+                                e.g. "/cards/{id}?fields=id,name"
+            params (Optional[Dict]): Query parameters sent with every batch request (key, token)
+            priority (Optional[str]): Override the session's priority for these requests
+
+        Returns:
+            Dict[str, Any]: The parsed response for each route, or a TrelloBatchError
+                            for routes that failed
+
+        Raises:
+            requests.RequestException: If a batch request itself fails
+        """
+        results = {}
+        unique_routes = list(dict.fromkeys(routes))
+
+        for start in range(0, len(unique_routes), self.BATCH_LIMIT):
+            chunk = unique_routes[start:start + self.BATCH_LIMIT]
+            # Commas separate the routes, so escape the ones inside a route
+            batch_params = dict(params or {}, urls=','.join(route.replace(',', '%2C') for route in chunk))
+
+            response = self.get(f"{base_url}/batch", params=batch_params, priority=priority)
+            response.raise_for_status()
+
+            for route, entry in zip(chunk, response.json()):
+                results[route] = self._batch_result(route, entry)
+
+        return results
+
+    @staticmethod
+    def _batch_result(route: str, entry: Dict) -> Any:
+        """Unwrap one /1/batch entry ({"200": body} or an error object)."""
+        if len(entry) == 1:
+            status, body = next(iter(entry.items()))
+            if status.isdigit():
+                if status == '200':
+                    return body
+                return TrelloBatchError(route, int(status), str(body))
+        return TrelloBatchError(route, int(entry.get('statusCode', 500)), entry.get('message', ''))
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+# Process-wide transport shared by every monitor that isn't given its own
+_shared_session: Optional[TrelloSession] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session(pool_size: int = 10) -> TrelloSession:
+    """
+    Get the process-wide shared Trello session, creating it on first use.
+
+    Args:
+        pool_size (int): Pool size used if the shared session has not been created yet
+
+    Returns:
+        TrelloSession: The shared session
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = TrelloSession(pool_size=pool_size)
+        return _shared_session
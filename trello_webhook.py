@@ -0,0 +1,403 @@
+"""
+Trello Webhook Receiver - Push-driven alternative to monitor() polling
+
+A small local HTTP receiver that accepts Trello webhook callbacks, turns the
+createCard/updateCard/deleteCard actions into the same diff dictionaries that
+compare_cards() produces, and hands them to the usual callback(diff). If no
+event arrives within a configurable window it falls back to polling until
+events resume.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from trello import TrelloListMonitor
+from trello_actions import apply_card_action
+from trello_board import TrelloBoardMonitor
+
+
+class TrelloWebhookReceiver:
+    """
+    Receive Trello webhook callbacks for a list or board monitor.
+
+    Usage:
+        monitor = TrelloListMonitor()
+        receiver = TrelloWebhookReceiver(monitor, port=8765,
+                                         callback_url="https://my-host.example/trello")
+        receiver.register()
+        receiver.serve(callback=handle_trello_changes, fallback_window=60)
+
+        # Offline: replay recorded webhook payloads without touching Trello
+        receiver = TrelloWebhookReceiver(list_id="list_id", cards=recorded_snapshot)
+        diffs = receiver.replay_file("recorded_webhooks.jsonl", callback=handle_trello_changes)
+    """
+
+    def __init__(self, monitor=None, host: str = '127.0.0.1', port: int = 8765,
+                 callback_url: Optional[str] = None, secret: Optional[str] = None,
+                 list_id: Optional[str] = None, lists: Optional[Dict[str, Dict]] = None,
+                 cards: Optional[Dict[str, Dict]] = None, record_path: Optional[str] = None,
+                 insecure: bool = False):
+        """
+        Initialize the webhook receiver.
+
+        Args:
+            monitor: A TrelloListMonitor or TrelloBoardMonitor used for the initial snapshot,
+                     fetching newly created cards and polling fallback.
+                     May be None for offline replay.
+            host (str): Interface for the local HTTP receiver. Defaults to localhost;
+                        expose it to Trello through a reverse proxy or tunnel
+            port (int): Port for the local HTTP receiver
+            callback_url (Optional[str]): Public URL Trello should call. Required for
+                                          register() and signature verification
+            secret (Optional[str]): Trello app secret used to verify X-Trello-Webhook
+                                    signatures. Defaults to TRELLO_API_SECRET from .env
+            list_id (Optional[str]): List to track when no monitor is given
+            lists (Optional[Dict[str, Dict]]): Board lists when tracking a board without a monitor
+            cards (Optional[Dict[str, Dict]]): Initial card snapshot (fetched from the monitor if None)
+            record_path (Optional[str]): If set, every received payload is appended here as
+                                         JSON lines so it can be replayed later
+            insecure (bool): Accept unsigned callbacks when no secret or callback_url is
+                             configured. Anyone who can reach the receiver can then
+                             inject card changes, so only use it for local testing
+        """
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.callback_url = callback_url
+        self.secret = secret or os.getenv("TRELLO_API_SECRET")
+        self.list_id = list_id or getattr(monitor, 'list_id', None)
+        self.lists = lists if lists is not None else getattr(monitor, 'lists', None)
+        self.cards = cards
+        self.record_path = record_path
+        self.insecure = insecure
+
+        if isinstance(monitor, TrelloBoardMonitor) or (monitor is None and self.lists is not None):
+            self.compare_cards = TrelloBoardMonitor.compare_cards
+            self.print_diff = TrelloBoardMonitor.print_diff
+        else:
+            self.compare_cards = TrelloListMonitor.compare_cards
+            self.print_diff = TrelloListMonitor.print_diff
+
+        self.events: "queue.Queue[Dict]" = queue.Queue()
+        self.webhook_id: Optional[str] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._record_lock = threading.Lock()
+
+    def register(self, description: str = "habititcan monitor") -> Dict:
+        """
+        Register a Trello webhook pointing at callback_url for the monitored list or board.
+
+        Returns:
+            Dict: The created webhook
+
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        if not self.monitor or not self.callback_url:
+            raise ValueError("register() needs both a monitor and a callback_url")
+
+        url = f"{self.monitor.base_url}/webhooks"
+        params = {
+            'key': self.monitor.api_key,
+            'token': self.monitor.token,
+            'callbackURL': self.callback_url,
+            'idModel': self.list_id or self.monitor.board_id,
+            'description': description
+        }
+
+        response = self.monitor.session.post(url, params=params)
+        response.raise_for_status()
+
+        webhook = response.json()
+        self.webhook_id = webhook['id']
+        return webhook
+
+    def unregister(self) -> bool:
+        """
+        Delete the webhook created by register().
+
+        Returns:
+            bool: True if deletion was successful, False otherwise
+        """
+        if not self.webhook_id:
+            return False
+
+        url = f"{self.monitor.base_url}/webhooks/{self.webhook_id}"
+        params = {
+            'key': self.monitor.api_key,
+            'token': self.monitor.token
+        }
+
+        try:
+            response = self.monitor.session.delete(url, params=params)
+            response.raise_for_status()
+            self.webhook_id = None
+            return True
+        except requests.RequestException as e:
+            print(f"Error deleting webhook: {e}")
+            return False
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """
+        Check the X-Trello-Webhook signature of a callback body.
+
+        Without a secret and callback_url nothing can be verified, so every
+        callback is rejected unless the receiver was created with insecure=True.
+
+        Args:
+            body (bytes): Raw request body
+            signature (Optional[str]): Value of the X-Trello-Webhook header
+
+        Returns:
+            bool: True if the signature matches
+        """
+        if not self.secret or not self.callback_url:
+            return self.insecure
+        digest = hmac.new(self.secret.encode(), body + self.callback_url.encode(), hashlib.sha1).digest()
+        return hmac.compare_digest(base64.b64encode(digest).decode(), signature or '')
+
+    def receive(self, payload: Dict):
+        """Queue a webhook payload for the serve() loop (called by the HTTP handler)."""
+        if self.record_path:
+            with self._record_lock, open(self.record_path, 'a') as f:
+                f.write(json.dumps(payload) + '\n')
+        self.events.put(payload)
+
+    def handle_payload(self, payload: Dict) -> Optional[Dict]:
+        """
+        Apply one webhook payload to the snapshot and return the resulting diff.
+
+        Args:
+            payload (Dict): A webhook body ({'action': ..., 'model': ...}) or a bare action
+
+        Returns:
+            Optional[Dict]: The diff, or None if the tracked cards didn't change
+
+        Raises:
+            requests.RequestException: If fetching a new card fails
+        """
+        if self.cards is None:
+            self.cards = self.monitor.get_cards()
+
+        action = payload.get('action', payload)
+        fetch_card = self.monitor.get_card if self.monitor else None
+
+        new_cards = dict(self.cards)
+        apply_card_action(new_cards, action, fetch_card, list_id=self.list_id, lists=self.lists)
+
+        diff = self.compare_cards(self.cards, new_cards)
+        self.cards = new_cards
+        return diff if any(diff.values()) else None
+
+    def poll(self) -> Optional[Dict]:
+        """
+        Fetch the full card state from the monitor and diff it against the snapshot.
+
+        Returns:
+            Optional[Dict]: The diff, or None if nothing changed
+
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        current_cards = self.monitor.get_cards()
+        diff = self.compare_cards(self.cards or {}, current_cards)
+        self.cards = current_cards
+        return diff if any(diff.values()) else None
+
+    def replay(self, payloads: Iterable[Dict], callback: Optional[Callable[[Dict], None]] = None,
+               verbose: bool = False) -> List[Dict]:
+        """
+        Feed recorded webhook payloads through the receiver as if they had just arrived.
+
+        Args:
+            payloads (Iterable[Dict]): Webhook bodies or bare actions, oldest first
+            callback (Optional[Callable[[Dict], None]]): Called with each non-empty diff
+            verbose (bool): Whether to print the diffs
+
+        Returns:
+            List[Dict]: The non-empty diffs, in order
+        """
+        if self.cards is None and self.monitor is None:
+            self.cards = {}
+
+        diffs = []
+        for payload in payloads:
+            diff = self.handle_payload(payload)
+            if diff is None:
+                continue
+            diffs.append(diff)
+            if verbose:
+                self.print_diff(diff)
+            if callback:
+                callback(diff)
+        return diffs
+
+    def replay_file(self, path: str, callback: Optional[Callable[[Dict], None]] = None,
+                    verbose: bool = False) -> List[Dict]:
+        """
+        Replay webhook payloads from a file.
+
+        The file may hold a single JSON payload, a JSON array of payloads, or one
+        payload per line (the format written by record_path).
+
+        Args:
+            path (str): Path to the recorded payloads
+            callback (Optional[Callable[[Dict], None]]): Called with each non-empty diff
+            verbose (bool): Whether to print the diffs
+
+        Returns:
+            List[Dict]: The non-empty diffs, in order
+        """
+        with open(path) as f:
+            content = f.read()
+
+        try:
+            loaded = json.loads(content)
+            payloads = loaded if isinstance(loaded, list) else [loaded]
+        except json.JSONDecodeError:
+            payloads = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+        return self.replay(payloads, callback=callback, verbose=verbose)
+
+    def start(self):
+        """
+        Start the local HTTP receiver in a background thread.
+
+        Raises:
+            ValueError: If signatures can't be verified (no secret or callback_url)
+                        and the receiver wasn't created with insecure=True
+        """
+        if self._server is not None:
+            return
+        if (not self.secret or not self.callback_url) and not self.insecure:
+            raise ValueError("Refusing to serve unsigned webhooks: set a secret (TRELLO_API_SECRET) "
+                             "and callback_url, or pass insecure=True for local testing")
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+
+    def stop(self):
+        """Stop the local HTTP receiver."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve(self, callback: Optional[Callable[[Dict], None]] = None, fallback_window: float = 60.0,
+              poll_interval: float = 1.0, max_iterations: Optional[int] = None, verbose: bool = True):
+        """
+        Run the receiver and invoke callback(diff) for every change.
+
+        If no webhook arrives within fallback_window seconds, the receiver polls the
+        monitor every poll_interval seconds until the next webhook arrives.
+
+        Args:
+            callback (Optional[Callable[[Dict], None]]): Function to call when changes are detected
+            fallback_window (float): Seconds without events before falling back to polling
+            poll_interval (float): Time between polls while in fallback mode
+            max_iterations (Optional[int]): Maximum number of events/polls (None for infinite)
+            verbose (bool): Whether to print status information
+        """
+        self.start()
+        if verbose:
+            print(f"Webhook receiver listening on http://{self.host}:{self.port}")
+            print(f"Falling back to polling after {fallback_window} seconds without events")
+            print("Press Ctrl+C to stop\n")
+
+        # Get initial state
+        if self.cards is None:
+            try:
+                self.cards = self.monitor.get_cards()
+                if verbose:
+                    print(f"Initial state: {len(self.cards)} cards")
+            except requests.RequestException as e:
+                print(f"Error fetching initial state: {e}")
+                self.stop()
+                return
+
+        push_active = True
+        iteration = 0
+        try:
+            while max_iterations is None or iteration < max_iterations:
+                timeout = fallback_window if push_active else poll_interval
+                try:
+                    payload = self.events.get(timeout=timeout)
+                except queue.Empty:
+                    payload = None
+
+                iteration += 1
+                try:
+                    if payload is None:
+                        if push_active and verbose:
+                            print(f"\nNo webhook events for {fallback_window}s, polling instead")
+                        push_active = False
+                        diff = self.poll()
+                    else:
+                        if not push_active and verbose:
+                            print("\nWebhook events resumed")
+                        push_active = True
+                        diff = self.handle_payload(payload)
+                except requests.RequestException as e:
+                    if verbose:
+                        print(f"Error fetching cards: {e}")
+                    continue
+
+                if verbose:
+                    print(".", end='')  # Print a dot for each event or poll
+
+                if diff:
+                    if verbose:
+                        self.print_diff(diff)
+                    if callback:
+                        callback(diff)
+
+        except KeyboardInterrupt:
+            if verbose:
+                print("\nMonitoring stopped by user")
+        finally:
+            self.stop()
+
+    def _make_handler(self):
+        """Build the request handler class bound to this receiver."""
+        receiver = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                # Trello sends a HEAD request to check the callback URL on registration
+                self.send_response(200)
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+
+                if not receiver.verify_signature(body, self.headers.get('X-Trello-Webhook')):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                receiver.receive(payload)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                # Keep the monitor's dot output readable
+                pass
+
+        return WebhookHandler